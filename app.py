@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import datetime as dt
+import io
+import os
 import random
-from typing import List
+import tempfile
+import uuid
+from typing import Callable, List, Optional
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
-import requests
 import streamlit as st
 
 from crowdlike.data import (
@@ -15,20 +19,40 @@ from crowdlike.data import (
     calculate_crowd_metrics,
     generate_leaderboard,
     Agent,
+    AgentStrategy,
     CrowdMetrics,
 )
-from crowdlike.ui import inject_global_css, sidebar_nav, hero_title, page_title, card
+from crowdlike.bulk import BulkError, FILE_NAMES, export_table, import_table, ImportReport
+from crowdlike.coach import InsightIndex, stream_reply
+from crowdlike.market import MarketCache, MarketRow, frame_deltas
+from crowdlike.registry import AgentRegistry, AgentFilter
+from crowdlike.risk import RiskEngine, fleet_version
+from crowdlike.session import SessionStore
+from crowdlike.snapshot import save_fleet, load_fleet, SnapshotError
+from crowdlike.sweep import PriceHistory, SweepCache, random_search, run_sweep
+from crowdlike.ui import inject_global_css, sidebar_nav, hero_title, page_title, card, spacer, sparkline
 
 st.set_page_config(page_title="Crowdlike", layout="wide", initial_sidebar_state="expanded")
 inject_global_css()
 
 # --------- App state ----------
+# st.session_state only holds small values; the fleet, chat history and derived caches live in
+# the shared SessionStore, whose background sweeper spills idle sessions to disk.
+@st.cache_resource
+def session_store() -> SessionStore:
+    store = SessionStore()
+    store.start()
+    return store
+
+@st.cache_resource
+def crowd_metrics() -> CrowdMetrics:
+    # the crowd is the same for every session
+    return calculate_crowd_metrics(generate_mock_agents(100))
+
 if "user" not in st.session_state:
     st.session_state.user = generate_mock_user()
-if "agents" not in st.session_state:
-    st.session_state.agents = generate_mock_agents(4, user_id=st.session_state.user.id)
-if "crowd_metrics" not in st.session_state:
-    st.session_state.crowd_metrics = calculate_crowd_metrics(generate_mock_agents(100))
+if "sid" not in st.session_state:
+    st.session_state.sid = uuid.uuid4().hex
 if "page" not in st.session_state:
     st.session_state.page = "home"
 
@@ -38,29 +62,86 @@ if chosen != st.session_state.page:
     st.session_state.page = chosen
     st.rerun()
 
+def new_fleet() -> AgentRegistry:
+    return AgentRegistry(generate_mock_agents(4, user_id=st.session_state.user.id))
+
+def live_registry() -> AgentRegistry:
+    # Widget callbacks run before the script body and may follow a spill, so they look the
+    # registry up at call time instead of using the one captured by the previous run.
+    return session_store().slot(st.session_state.sid, new_fleet).registry
+
 user = st.session_state.user
-agents: List[Agent] = st.session_state.agents
-crowd: CrowdMetrics = st.session_state.crowd_metrics
+session = session_store().slot(st.session_state.sid, new_fleet)
+registry: AgentRegistry = session.registry
+agents: List[Agent] = registry.agents
+crowd: CrowdMetrics = crowd_metrics()
 
 # --------- Data helpers ----------
-def coingecko_markets():
-    ids = ["bitcoin","ethereum","solana","cardano","polkadot","binancecoin","ripple","dogecoin"]
-    url = "https://api.coingecko.com/api/v3/coins/markets"
-    params = {
-        "vs_currency": "usd",
-        "ids": ",".join(ids),
-        "order": "market_cap_desc",
-        "per_page": 50,
-        "page": 1,
-        "sparkline": "false",
-        "price_change_percentage": "24h",
-    }
-    try:
-        r = requests.get(url, params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except Exception:
-        return None
+@st.cache_resource
+def risk_engine() -> RiskEngine:
+    return RiskEngine()
+
+@st.cache_resource
+def sweep_cache() -> SweepCache:
+    # Shared by all sessions, so repeated sweeps over the same prices are lookups.
+    return SweepCache()
+
+@st.cache_resource
+def price_history() -> PriceHistory:
+    return PriceHistory.demo()
+
+MARKET_TTL = 10.0  # seconds between upstream fetches, whatever the viewers' refresh interval
+MARKET_REFRESH = {"Off": None, "5s": 5, "10s": 10, "30s": 30, "60s": 60}
+
+@st.cache_resource
+def market_cache() -> MarketCache:
+    # One fetch per MARKET_TTL shared by every session watching the market.
+    return MarketCache(ttl=MARKET_TTL)
+
+def insight_index() -> InsightIndex:
+    # One index per registry, kept current through registry change events.
+    source, index = session.cache.get("coach_index", (None, None))
+    if source is not registry:
+        index = InsightIndex(registry.agents, crowd)
+        registry.subscribe(index.apply)
+        session.cache["coach_index"] = (registry, index)
+    return index
+
+COACH_PAGE = 10
+
+ANALYTICS_FOCUS = 12  # agents drawn individually on the Analytics charts
+ANALYTICS_FOCUS_BY = {
+    "Top Sharpe": lambda r: np.argsort(-r.sharpe, kind="stable"),
+    "Bottom Sharpe": lambda r: np.argsort(r.sharpe, kind="stable"),
+    "Most volatile": lambda r: np.argsort(-r.volatility, kind="stable"),
+    "Pick agents": None,
+}
+
+BULK_ACTIONS = {
+    "Pause": lambda sel: live_registry().pause(sel),
+    "Resume": lambda sel: live_registry().resume(sel),
+    "Delete": lambda sel: live_registry().delete(sel),
+    "Set riskness": lambda sel: live_registry().set_riskness(sel, st.session_state.bulk_riskness),
+}
+
+def toggle_agent(agent_id: str) -> None:
+    live_registry().toggle(agent_id)
+
+def remove_agent(agent_id: str) -> None:
+    live_registry().remove(agent_id)
+
+def apply_bulk_action() -> None:
+    # Runs as a widget callback, before the rerun that renders the result.
+    lo, hi = st.session_state.bulk_risk_range
+    sel = AgentFilter(
+        statuses=set(st.session_state.bulk_statuses) or None,
+        strategies=set(st.session_state.bulk_strategies) or None,
+        minRisk=lo,
+        maxRisk=hi,
+    )
+    action = st.session_state.bulk_action
+    n = BULK_ACTIONS[action](sel)
+    st.session_state.bulk_result = f"{action}: {n} agent(s) updated."
 
 # --------- Pages ----------
 def page_home():
@@ -69,46 +150,46 @@ def page_home():
     col1, col2, col3 = st.columns(3, gap="large")
     with col1:
         card("""
-            <div style="font-size:2.25rem; margin-bottom:0.75rem;">🤖</div>
-            <div style="font-weight:900; font-size:1.1rem; margin-bottom:0.35rem;">AI Agents</div>
+            <div class="c-icon-lg">🤖</div>
+            <div class="c-h-sm c-mb1">AI Agents</div>
             <div class="c-muted">Create and manage multiple AI trading agents with different strategies</div>
         """)
     with col2:
         card("""
-            <div style="font-size:2.25rem; margin-bottom:0.75rem;">📊</div>
-            <div style="font-weight:900; font-size:1.1rem; margin-bottom:0.35rem;">Real Market Data</div>
+            <div class="c-icon-lg">📊</div>
+            <div class="c-h-sm c-mb1">Real Market Data</div>
             <div class="c-muted">Paper trading with real-time market data from CoinGecko</div>
         """)
     with col3:
         card("""
-            <div style="font-size:2.25rem; margin-bottom:0.75rem;">🏆</div>
-            <div style="font-weight:900; font-size:1.1rem; margin-bottom:0.35rem;">Leaderboards</div>
+            <div class="c-icon-lg">🏆</div>
+            <div class="c-h-sm c-mb1">Leaderboards</div>
             <div class="c-muted">Compare agent performance across daily, weekly, and monthly timeframes</div>
         """)
 
-    st.markdown('<div style="height: 1.5rem;"></div>', unsafe_allow_html=True)
+    spacer("l")
 
     card("""
-      <div style="font-weight:900; font-size:1.6rem; margin-bottom:1rem;">Getting Started</div>
-      <div style="display:flex; flex-direction:column; gap:0.9rem;">
-        <div style="display:flex; gap:0.75rem; align-items:flex-start;">
-          <div style="width:2rem; height:2rem; border-radius:999px; background:#3b82f6; color:white; display:flex; align-items:center; justify-content:center; font-weight:900;">1</div>
+      <div class="c-h-xl c-mb3">Getting Started</div>
+      <div class="c-vstack-lg">
+        <div class="c-hstack">
+          <div class="c-badge c-bg-blue">1</div>
           <div>
-            <div style="font-weight:900;">Create Your First Agent</div>
+            <div class="c-b">Create Your First Agent</div>
             <div class="c-muted">Navigate to the Agents page and set up your AI trading agent</div>
           </div>
         </div>
-        <div style="display:flex; gap:0.75rem; align-items:flex-start;">
-          <div style="width:2rem; height:2rem; border-radius:999px; background:#8b5cf6; color:white; display:flex; align-items:center; justify-content:center; font-weight:900;">2</div>
+        <div class="c-hstack">
+          <div class="c-badge c-bg-violet">2</div>
           <div>
-            <div style="font-weight:900;">Configure Strategy</div>
+            <div class="c-b">Configure Strategy</div>
             <div class="c-muted">Set risk levels, trading limits, and safety parameters</div>
           </div>
         </div>
-        <div style="display:flex; gap:0.75rem; align-items:flex-start;">
-          <div style="width:2rem; height:2rem; border-radius:999px; background:#db2777; color:white; display:flex; align-items:center; justify-content:center; font-weight:900;">3</div>
+        <div class="c-hstack">
+          <div class="c-badge c-bg-pink">3</div>
           <div>
-            <div style="font-weight:900;">Start Trading</div>
+            <div class="c-b">Start Trading</div>
             <div class="c-muted">Monitor performance and watch your agents compete on the leaderboard</div>
           </div>
         </div>
@@ -129,50 +210,50 @@ def page_dashboard():
     c1, c2, c3, c4 = st.columns(4, gap="large")
     with c1:
         card(f"""
-            <div style="display:flex; justify-content:space-between; align-items:flex-start;">
+            <div class="c-row-top">
               <div>
-                <div class="c-muted" style="font-weight:800;">Total Agents</div>
-                <div style="font-size:2rem; font-weight:900; margin-top:0.25rem;">{len(agents)}</div>
-                <div class="c-muted" style="margin-top:0.2rem;">{len(active_agents)} active</div>
+                <div class="c-muted c-b8">Total Agents</div>
+                <div class="c-stat">{len(agents)}</div>
+                <div class="c-muted c-mt1">{len(active_agents)} active</div>
               </div>
-              <div style="font-size:2rem;">🤖</div>
+              <div class="c-icon">🤖</div>
             </div>
         """)
     with c2:
         card(f"""
-            <div style="display:flex; justify-content:space-between; align-items:flex-start;">
+            <div class="c-row-top">
               <div>
-                <div class="c-muted" style="font-weight:800;">Total Portfolio Value</div>
-                <div style="font-size:2rem; font-weight:900; margin-top:0.25rem;">${total_portfolio_value:,.2f}</div>
-                <div class="c-muted" style="margin-top:0.2rem;">{total_profit_percent:+.2f}%</div>
+                <div class="c-muted c-b8">Total Portfolio Value</div>
+                <div class="c-stat">${total_portfolio_value:,.2f}</div>
+                <div class="c-muted c-mt1">{total_profit_percent:+.2f}%</div>
               </div>
-              <div style="font-size:2rem;">💰</div>
+              <div class="c-icon">💰</div>
             </div>
         """)
     with c3:
         card(f"""
-            <div style="display:flex; justify-content:space-between; align-items:flex-start;">
+            <div class="c-row-top">
               <div>
-                <div class="c-muted" style="font-weight:800;">Best Performer</div>
-                <div style="font-size:1.2rem; font-weight:900; margin-top:0.35rem;">{best.name if best else "None"}</div>
-                <div class="c-muted" style="margin-top:0.2rem;">{(best.performance.totalProfitPercent if best else 0):+.2f}%</div>
+                <div class="c-muted c-b8">Best Performer</div>
+                <div class="c-stat-sm">{best.name if best else "None"}</div>
+                <div class="c-muted c-mt1">{(best.performance.totalProfitPercent if best else 0):+.2f}%</div>
               </div>
-              <div style="font-size:2rem;">🏆</div>
+              <div class="c-icon">🏆</div>
             </div>
         """)
     with c4:
         card(f"""
-            <div style="display:flex; justify-content:space-between; align-items:flex-start;">
+            <div class="c-row-top">
               <div>
-                <div class="c-muted" style="font-weight:800;">Active Positions</div>
-                <div style="font-size:2rem; font-weight:900; margin-top:0.25rem;">{active_positions}</div>
-                <div class="c-muted" style="margin-top:0.2rem;">{sum(a.performance.totalTrades for a in agents)} total trades</div>
+                <div class="c-muted c-b8">Active Positions</div>
+                <div class="c-stat">{active_positions}</div>
+                <div class="c-muted c-mt1">{sum(a.performance.totalTrades for a in agents)} total trades</div>
               </div>
-              <div style="font-size:2rem;">📈</div>
+              <div class="c-icon">📈</div>
             </div>
         """)
 
-    st.markdown('<div style="height: 1.25rem;"></div>', unsafe_allow_html=True)
+    spacer("m")
 
     left, right = st.columns([2,1], gap="large")
     with left:
@@ -180,12 +261,12 @@ def page_dashboard():
         df = pd.DataFrame(perf)
         fig = px.line(df, x="day", y="value")
         fig.update_layout(margin=dict(l=10,r=10,t=10,b=10), height=320)
-        card("<div style='font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;'>Portfolio Performance (30d)</div>")
+        card("<div class='c-h c-mb2'>Portfolio Performance (30d)</div>")
         st.plotly_chart(fig, use_container_width=True)
     with right:
         card(f"""
-          <div style="font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;">Crowd Signals</div>
-          <div style="display:flex; flex-direction:column; gap:0.6rem;">
+          <div class="c-h c-mb2">Crowd Signals</div>
+          <div class="c-vstack">
             <div><span class="c-muted">Similarity Score:</span> <b>{crowd.similarityScore:.0f}%</b></div>
             <div><span class="c-muted">Momentum Score:</span> <b>{crowd.momentumScore:.0f}%</b></div>
             <div><span class="c-muted">Strain Score:</span> <b>{crowd.strainScore:.0f}%</b></div>
@@ -202,12 +283,12 @@ def page_agents():
         st.markdown(
             """
             <div class="c-card c-card-pad">
-              <div style="display:flex; align-items:center; justify-content:space-between;">
+              <div class="c-row">
                 <div>
-                  <div style="font-weight:900; font-size:1.4rem;">Plan</div>
+                  <div class="c-h-lg">Plan</div>
                   <div class="c-muted">Daily price (demo): <b>$3.00</b></div>
                 </div>
-                <div style="font-size:2rem;">⚡</div>
+                <div class="c-icon">⚡</div>
               </div>
             </div>
             """,
@@ -223,49 +304,84 @@ def page_agents():
                 if len(agents) >= user.settings.maxAgents:
                     st.error("Max agents reached for this account.")
                 else:
-                    from crowdlike.data import AgentStrategy, generate_mock_agents
                     new = generate_mock_agents(1, user_id=user.id)[0]
-                    new.id = f"agent_{len(agents)+1}"
                     new.name = name.strip() or new.name
                     new.strategy = AgentStrategy(type=strategy)
                     new.riskness = int(risk)
                     new.portfolio.totalValue = float(balance)
                     new.portfolio.usdcBalance = float(balance) * 0.3
-                    st.session_state.agents = agents + [new]
+                    registry.add(new, assign_id=True)
                     st.success("Agent created.")
                     st.rerun()
 
-    st.markdown('<div style="height: 0.75rem;"></div>', unsafe_allow_html=True)
-
-    for a in st.session_state.agents:
+    with st.expander("🧰 Bulk actions", expanded=False):
+        with st.form("bulk_form", border=False):
+            f1, f2, f3 = st.columns(3)
+            with f1:
+                st.multiselect("Status", ["active","paused","exited"], key="bulk_statuses")
+            with f2:
+                st.multiselect("Strategy", ["aggressive","conservative","balanced","swing","daytrading","hodl","custom"], key="bulk_strategies")
+            with f3:
+                st.slider("Riskness range", 0, 100, (0, 100), key="bulk_risk_range")
+            a1, a2 = st.columns(2)
+            with a1:
+                st.selectbox("Action", list(BULK_ACTIONS), key="bulk_action")
+            with a2:
+                st.slider("New riskness (Set riskness only)", 0, 100, 50, key="bulk_riskness")
+            st.form_submit_button("Apply to matching agents", type="primary", on_click=apply_bulk_action)
+    if "bulk_result" in st.session_state:
+        st.success(st.session_state.pop("bulk_result"))
+
+    with st.expander("🔬 Parameter sweep", expanded=False):
+        st.caption("Backtest strategy × riskness × position size × safety-exit combinations over the last year of demo prices.")
+        s1, s2 = st.columns(2)
+        with s1:
+            n_variants = st.select_slider("Variants", [250, 500, 1000, 2500, 5000], value=1000)
+        with s2:
+            seed = st.number_input("Seed", min_value=0, value=0, step=1)
+        if st.button("Run sweep"):
+            # serial: forking a process pool per click from the server is slower than the sweep
+            report = run_sweep(random_search(n_variants, seed=int(seed)), price_history(), workers=1,
+                               cache=sweep_cache())
+            session.cache["sweep_report"] = report
+        report = session.cache.get("sweep_report")
+        if report is not None:
+            st.caption(f"{len(report.results)} variants in {report.seconds:.2f}s — {report.hits} cached, {report.misses} computed. "
+                       "Frontier: best return for each level of max drawdown.")
+            frontier = report.to_frame(frontier_only=True).drop(columns=["exitDay"])
+            st.dataframe(frontier.head(15).round(2), use_container_width=True, hide_index=True)
+
+    spacer("s")
+
+    for a in agents:
         status_badge = {"active":"🟢 Active", "paused":"🟡 Paused", "exited":"🔴 Exited"}[a.status]
         profit = a.performance.totalProfitPercent
         arrow = "📈" if profit >= 0 else "📉"
 
         st.markdown(
             f"""
-            <div class="c-card c-card-pad" style="margin-bottom: 0.75rem;">
-              <div style="display:flex; align-items:flex-start; justify-content:space-between; gap:1rem;">
-                <div style="min-width: 18rem;">
-                  <div style="display:flex; align-items:center; gap:0.6rem;">
-                    <div style="font-weight:900; font-size:1.25rem;">{a.name}</div>
-                    <div class="c-muted" style="font-weight:800;">{a.botId}</div>
+            <div class="c-card c-card-pad c-mb2">
+              <div class="c-row-top c-g1">
+                <div class="c-minw">
+                  <div class="c-inline">
+                    <div class="c-h">{a.name}</div>
+                    <div class="c-muted c-b8">{a.botId}</div>
                   </div>
-                  <div class="c-muted" style="margin-top:0.25rem;">{status_badge} • Strategy: <b>{a.strategy.type}</b> • Risk: <b>{a.riskness}</b></div>
+                  <div class="c-muted c-mt2">{status_badge} • Strategy: <b>{a.strategy.type}</b> • Risk: <b>{a.riskness}</b></div>
                 </div>
 
-                <div style="display:flex; gap:1.5rem; align-items:center; flex-wrap:wrap;">
+                <div class="c-wrap">
                   <div>
-                    <div class="c-muted" style="font-weight:800;">Portfolio</div>
-                    <div style="font-weight:900; font-size:1.25rem;">${a.portfolio.totalValue:,.2f}</div>
+                    <div class="c-muted c-b8">Portfolio</div>
+                    <div class="c-h">${a.portfolio.totalValue:,.2f}</div>
                   </div>
                   <div>
-                    <div class="c-muted" style="font-weight:800;">Profit</div>
-                    <div style="font-weight:900; font-size:1.25rem;">{profit:+.2f}% {arrow}</div>
+                    <div class="c-muted c-b8">Profit</div>
+                    <div class="c-h">{profit:+.2f}% {arrow}</div>
                   </div>
                   <div>
-                    <div class="c-muted" style="font-weight:800;">Win Rate</div>
-                    <div style="font-weight:900; font-size:1.25rem;">{a.performance.winRate:.0f}%</div>
+                    <div class="c-muted c-b8">Win Rate</div>
+                    <div class="c-h">{a.performance.winRate:.0f}%</div>
                   </div>
                 </div>
               </div>
@@ -276,13 +392,9 @@ def page_agents():
 
         b1, b2, b3 = st.columns([1,1,3])
         with b1:
-            if st.button("▶/⏸ Toggle", key=f"toggle_{a.id}"):
-                a.status = "paused" if a.status == "active" else "active"
-                st.rerun()
+            st.button("▶/⏸ Toggle", key=f"toggle_{a.id}", on_click=toggle_agent, args=(a.id,))
         with b2:
-            if st.button("🗑 Delete", key=f"del_{a.id}"):
-                st.session_state.agents = [x for x in st.session_state.agents if x.id != a.id]
-                st.rerun()
+            st.button("🗑 Delete", key=f"del_{a.id}", on_click=remove_agent, args=(a.id,))
         with b3:
             with st.expander("View details", expanded=False):
                 st.write({
@@ -304,88 +416,83 @@ def page_agents():
 def page_coach():
     page_title("AI Coach", "Insights and recommendations based on your agents and crowd behavior")
 
-    if "coach_messages" not in st.session_state:
-        st.session_state.coach_messages = [{
-            "role": "assistant",
-            "content": "Hello! I'm your AI Coach. I can help you optimize your trading strategies, analyze agent performance, and provide insights based on crowd behavior. How can I assist you today?",
-            "ts": dt.datetime.now(),
-        }]
-
-    for m in st.session_state.coach_messages:
-        if m["role"] == "assistant":
-            card(f"<div style='font-weight:900; margin-bottom:0.35rem;'>🧠 Coach</div><div style='white-space:pre-wrap;'>{m['content']}</div>")
-        else:
-            card(f"<div style='font-weight:900; margin-bottom:0.35rem;'>You</div><div style='white-space:pre-wrap;'>{m['content']}</div>")
-        st.markdown('<div style="height: 0.6rem;"></div>', unsafe_allow_html=True)
+    chat = session.chat
+    if not len(chat):
+        chat.append("assistant", "Hello! I'm your AI Coach. I can help you optimize your trading strategies, analyze agent performance, and provide insights based on crowd behavior. How can I assist you today?")
+
+    def coach_card(role: str, content: str, target=None) -> None:
+        who = "🧠 Coach" if role == "assistant" else "You"
+        card(f"<div class='c-b c-mb1'>{who}</div><div class='c-pre'>{content}</div>", target=target)
+
+    if chat.archived:
+        # older turns are paged out to disk and only read when asked for
+        st.caption(chat.summary())
+        if st.toggle("Show earlier messages", key="coach_show_archive"):
+            pages = (chat.archived + COACH_PAGE - 1) // COACH_PAGE
+            page = st.number_input("Page (1 = oldest)", 1, pages, pages, key="coach_archive_page")
+            for m in chat.page((page - 1) * COACH_PAGE, COACH_PAGE):
+                coach_card(m.role, m.content)
+                spacer("xs")
+            st.divider()
+
+    for m in chat.recent():
+        coach_card(m.role, m.content)
+        spacer("xs")
 
     prompt = st.text_area("Ask your coach", height=90, placeholder="Ask about strategy, performance, risk, or crowd signals...")
     if st.button("Send", type="primary"):
         if prompt.strip():
-            st.session_state.coach_messages.append({"role":"user","content":prompt.strip(),"ts":dt.datetime.now()})
-
-            lower = prompt.lower()
-            if "strategy" in lower or "improve" in lower or "better" in lower:
-                avg_profit = sum(a.performance.totalProfitPercent for a in agents) / (len(agents) or 1)
-                content = (
-                    f"Based on your current performance (avg {avg_profit:.2f}% profit), I recommend:\n\n"
-                    f"1. **Diversify Risk Levels**: Balance aggressive (risk 70–100) and conservative (risk 20–40) agents.\n\n"
-                    f"2. **Leverage Crowd Learning**: The crowd's average risk is {crowd.avgRiskness}. Agents closer to this tend to perform consistently.\n\n"
-                    f"3. **Monitor Win Rates**: Focus on agents with win rates above 55%. Adjust underperformers.\n\n"
-                    f"4. **Position Sizing**: Crowd average is {crowd.avgPositionSize:.0f}% per trade. Align your agents with or slightly beat this.\n\n"
-                    "Would you like specific recommendations for any particular agent?"
-                )
-            elif "agent" in lower:
-                best = max(agents, key=lambda a: a.performance.totalProfitPercent) if agents else None
-                content = (
-                    f"Your strongest agent right now is **{best.name if best else 'N/A'}**.\n\n"
-                    "For next steps, consider:\n"
-                    "- Lowering risk on any agent with high drawdown\n"
-                    "- Increasing max trades/day only for agents with consistent win rates\n"
-                    "- Keeping deviation from the crowd under your safety threshold"
-                )
-            else:
-                content = (
-                    "I can help with:\n\n"
-                    "- Strategy tuning (risk, position size, trade frequency)\n"
-                    "- Identifying your best/worst agents\n"
-                    "- Understanding crowd similarity and momentum\n\n"
-                    "Ask me about a specific agent or goal."
-                )
-
-            st.session_state.coach_messages.append({"role":"assistant","content":content,"ts":dt.datetime.now()})
-            st.rerun()
+            chat.append("user", prompt.strip())
+            coach_card("user", prompt.strip())
+            spacer("xs")
+
+            # composed from the insight index and streamed a few paragraphs at a time
+            text = ""
+            slot = st.empty()
+            for chunk in stream_reply(prompt.strip(), insight_index()):
+                text += chunk
+                coach_card("assistant", text + " ▌", target=slot)
+            coach_card("assistant", text, target=slot)
+            chat.append("assistant", text)
+
+def market_row(row: MarketRow, delta: float) -> str:
+    flash = " c-mrow-up" if delta > 0 else (" c-mrow-down" if delta < 0 else "")
+    tone = "c-pos" if row.change24h >= 0 else "c-neg"
+    decimals = 2 if row.price >= 1 else 4
+    return (
+        f'<div class="c-mrow{flash}">'
+        f'<div><div class="c-b">{row.name}</div><div class="c-muted c-b8">{row.symbol}</div></div>'
+        f'<div class="c-h-sm">${row.price:,.{decimals}f}</div>'
+        f'<div class="{tone} c-b8">{row.change24h:+.2f}%</div>'
+        f"{sparkline(row.spark)}</div>"
+    )
+
+def market_board() -> None:
+    # Runs as a fragment: a refresh reruns only this board. Rows are rebuilt only for assets whose
+    # MarketRow changed since the frame this session last rendered; the rest reuse their markup.
+    frame = market_cache().frame()
+    seen, rows = st.session_state.get("market_seen", (None, {}))
+    for sym, delta in frame_deltas(seen, frame).items():
+        rows[sym] = market_row(frame.rows[sym], delta)
+    st.session_state.market_seen = (frame.rows, rows)
+
+    source = "CoinGecko" if frame.live else "Demo feed (offline)"
+    stamp = dt.datetime.fromtimestamp(frame.ts).strftime("%H:%M:%S")
+    st.caption(f"{source} · frame {frame.version} · {stamp}")
+    if not frame.live:
+        st.warning("CoinGecko unavailable right now — showing demo prices.")
+    for sym in frame.rows:
+        st.markdown(rows[sym], unsafe_allow_html=True)
 
 def page_market():
     page_title("Market", "Real-time market data (CoinGecko) with demo fallback")
 
-    data = coingecko_markets()
-    if data is None:
-        st.warning("CoinGecko unavailable right now — showing demo prices.")
-        data = [{
-            "name": name,
-            "symbol": sym.lower(),
-            "current_price": base * random.uniform(0.95, 1.05),
-            "price_change_percentage_24h": random.uniform(-5, 5),
-        } for sym, name, base in [
-            ("BTC","Bitcoin",43000),
-            ("ETH","Ethereum",2300),
-            ("SOL","Solana",90),
-            ("ADA","Cardano",0.5),
-            ("DOT","Polkadot",7.0),
-            ("BNB","BNB",300),
-            ("XRP","XRP",0.55),
-            ("DOGE","Dogecoin",0.08),
-        ]]
-
-    df = pd.DataFrame([{
-        "Asset": d.get("name",""),
-        "Symbol": str(d.get("symbol","")).upper(),
-        "Price (USD)": float(d.get("current_price") or 0),
-        "24h %": float(d.get("price_change_percentage_24h") or 0),
-    } for d in data])
-
-    card("<div style='font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;'>Market Overview</div>")
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    head, pick = st.columns([3, 1])
+    with head:
+        card("<div class='c-h'>Market Overview</div>")
+    with pick:
+        choice = st.select_slider("Auto-refresh", list(MARKET_REFRESH), value="10s", key="market_refresh")
+    st.fragment(run_every=MARKET_REFRESH[choice])(market_board)()
 
 def page_analytics():
     page_title("Analytics", "Deeper insights into agents and portfolio trends")
@@ -401,14 +508,55 @@ def page_analytics():
     with left:
         fig = px.scatter(df, x="Risk", y="Profit%", hover_name="Agent")
         fig.update_layout(margin=dict(l=10,r=10,t=10,b=10), height=360)
-        card("<div style='font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;'>Risk vs Profit</div>")
+        card("<div class='c-h c-mb2'>Risk vs Profit</div>")
         st.plotly_chart(fig, use_container_width=True)
     with right:
         fig2 = px.bar(df, x="Agent", y="WinRate%")
         fig2.update_layout(margin=dict(l=10,r=10,t=10,b=10), height=360)
-        card("<div style='font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;'>Win Rates</div>")
+        card("<div class='c-h c-mb2'>Win Rates</div>")
         st.plotly_chart(fig2, use_container_width=True)
 
+    if not agents:
+        return
+
+    spacer("m")
+    confidence = st.select_slider("VaR confidence", options=[0.90, 0.95, 0.99], value=0.95, format_func=lambda c: f"{c:.0%}")
+    report = risk_engine().report(agents, version=fleet_version(agents), confidence=confidence)
+
+    card("<div class='c-h c-mb2'>Risk Metrics (1y daily returns)</div>")
+    st.dataframe(report.to_frame().round(2), use_container_width=True, hide_index=True)
+
+    # Per-agent charts are bounded to ANALYTICS_FOCUS agents; the fleet shows as percentiles.
+    focus_by = st.radio("Focus", list(ANALYTICS_FOCUS_BY), horizontal=True, key="analytics_focus")
+    if focus_by == "Pick agents":
+        idx = st.multiselect("Agents", range(len(report.names)), format_func=lambda i: report.names[i],
+                             default=list(range(min(3, len(report.names)))), max_selections=ANALYTICS_FOCUS,
+                             key="analytics_pick")
+    else:
+        idx = ANALYTICS_FOCUS_BY[focus_by](report)[:ANALYTICS_FOCUS].tolist()
+
+    labels = [f"{report.names[i]} ({report.agentIds[i]})" for i in idx]
+
+    left, right = st.columns(2, gap="large")
+    with left:
+        days = range(report.window, report.window + report.rollingVol.shape[1])
+        bands = np.percentile(report.rollingVol, [10, 50, 90], axis=0) * 100
+        vol = pd.DataFrame({"day": days, "fleet p10": bands[0], "fleet median": bands[1], "fleet p90": bands[2]})
+        for i, label in zip(idx, labels):
+            vol[label] = report.rollingVol[i] * 100
+        fig3 = px.line(vol.melt(id_vars="day", var_name="Agent", value_name="Vol%"), x="day", y="Vol%", color="Agent")
+        fig3.update_layout(margin=dict(l=10,r=10,t=10,b=10), height=360)
+        card(f"<div class='c-h c-mb2'>Rolling Volatility ({report.window}d)</div>")
+        st.plotly_chart(fig3, use_container_width=True)
+    with right:
+        card(f"<div class='c-h c-mb2'>Return Correlation · {len(idx)} of {len(report.names)} agents</div>")
+        if len(idx) >= 2:
+            fig4 = px.imshow(report.correlation(idx), x=labels, y=labels, zmin=-1, zmax=1, color_continuous_scale="RdBu_r")
+            fig4.update_layout(margin=dict(l=10,r=10,t=10,b=10), height=360)
+            st.plotly_chart(fig4, use_container_width=True)
+        else:
+            st.caption("Pick at least two agents to compare.")
+
 def page_leaderboards():
     page_title("Leaderboards", "Compare performance across timeframes")
 
@@ -424,7 +572,7 @@ def page_leaderboards():
                 "Win Rate": f"{e.winRate:.0f}%",
                 "Risk": e.riskness,
             } for e in entries])
-            card("<div style='font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;'>Top Agents</div>")
+            card("<div class='c-h c-mb2'>Top Agents</div>")
             st.dataframe(df, use_container_width=True, hide_index=True)
 
 def page_safety():
@@ -433,31 +581,39 @@ def page_safety():
     left, right = st.columns([1,1], gap="large")
     with left:
         card("""
-          <div style="font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;">Crowd Deviation</div>
+          <div class="c-h c-mb2">Crowd Deviation</div>
           <div class="c-muted">Keep agents within a safe behavioral envelope. High deviation can trigger exits.</div>
         """)
         st.metric("Max deviation (account)", f"{user.settings.maxDeviationPercent}%")
         st.metric("Crowd similarity score", f"{crowd.similarityScore:.0f}%")
     with right:
         card("""
-          <div style="font-weight:900; font-size:1.25rem; margin-bottom:0.75rem;">Safety Exits</div>
+          <div class="c-h c-mb2">Safety Exits</div>
           <div class="c-muted">Configure agent exits based on daily loss, drawdown, or fraud signals.</div>
         """)
         st.write("In this Streamlit rebuild, exits are demo-configured per agent (editable in Agents → details).")
 
+def prepared_file(slot: str, ident: object, label: str, build: Callable[[], bytes]) -> Optional[bytes]:
+    # Download payloads are built on request and kept in the session cache while `ident` (which
+    # includes the fleet version) still matches, so ordinary reruns do not serialize the fleet.
+    cached = session.cache.get(slot)
+    if (cached is None or cached[0] != ident) and st.button(label, key=f"prepare_{slot}"):
+        cached = session.cache[slot] = (ident, build())
+    return cached[1] if cached is not None and cached[0] == ident else None
+
 def page_profile():
     page_title("Profile", "Your account and preferences")
 
     card(f"""
-      <div style="display:flex; align-items:center; justify-content:space-between;">
+      <div class="c-row">
         <div>
-          <div style="font-weight:900; font-size:1.4rem;">{user.name}</div>
+          <div class="c-h-lg">{user.name}</div>
           <div class="c-muted">{user.email}</div>
         </div>
-        <div style="font-size:2rem;">👤</div>
+        <div class="c-icon">👤</div>
       </div>
     """)
-    st.markdown('<div style="height: 1rem;"></div>', unsafe_allow_html=True)
+    spacer()
     c1, c2, c3 = st.columns(3, gap="large")
     with c1:
         st.metric("USDC Balance", f"${user.usdcBalance:,.2f}")
@@ -466,6 +622,118 @@ def page_profile():
     with c3:
         st.metric("Default Risk Level", user.settings.defaultRiskLevel)
 
+    spacer()
+    card("""
+      <div class="c-h c-mb1">Fleet Snapshot</div>
+      <div class="c-muted">Save your agents, portfolios and settings to a compact binary snapshot, or restore one.</div>
+    """)
+    s1, s2 = st.columns(2, gap="large")
+    with s1:
+        def build_snapshot() -> bytes:
+            buf = io.BytesIO()
+            save_fleet(buf, agents, user=user)
+            return buf.getvalue()
+        data = prepared_file("snapshot_file", registry.version, "Prepare snapshot", build_snapshot)
+        if data is not None:
+            st.download_button("⬇ Download snapshot", data, file_name="crowdlike-fleet.snap", mime="application/octet-stream")
+    with s2:
+        uploaded = st.file_uploader("Restore snapshot", type=["snap"])
+        if uploaded is not None and st.button("Restore", type="primary"):
+            with tempfile.NamedTemporaryFile(suffix=".snap", delete=False) as tmp:
+                tmp.write(uploaded.getvalue())
+            try:
+                restored_user, restored = load_fleet(tmp.name)
+            except SnapshotError as e:
+                st.error(f"Could not restore snapshot: {e}")
+            else:
+                if restored_user is not None:
+                    st.session_state.user = restored_user
+                session.registry = AgentRegistry(restored)
+                st.success(f"Restored {len(restored)} agents.")
+                st.rerun()
+            finally:
+                os.unlink(tmp.name)
+
+    spacer()
+    card("""
+      <div class="c-h c-mb1">Bulk Import / Export</div>
+      <div class="c-muted">Agents, positions, safety exits and trade history as CSV or Parquet tables.</div>
+    """)
+    b1, b2 = st.columns(2, gap="large")
+    with b1:
+        table = st.selectbox("Table", list(FILE_NAMES), format_func=lambda t: FILE_NAMES[t].replace("_", " ").title())
+        fmt = st.radio("Format", ["csv", "parquet"], horizontal=True)
+        def build_export() -> bytes:
+            buf = io.BytesIO()
+            if fmt == "csv":
+                text = io.TextIOWrapper(buf, encoding="utf-8", newline="")
+                export_table(table, agents, text, fmt="csv")
+                text.flush()
+            else:
+                export_table(table, agents, buf, fmt="parquet")
+            return buf.getvalue()
+        try:
+            data = prepared_file("bulk_export", (table, fmt, registry.version), "Prepare export", build_export)
+        except BulkError as e:
+            st.warning(str(e))
+        else:
+            if data is not None:
+                st.download_button(f"⬇ Download {FILE_NAMES[table]}.{fmt}", data, file_name=f"crowdlike-{FILE_NAMES[table]}.{fmt}")
+    with b2:
+        uploads = st.file_uploader("Import tables", type=["csv", "parquet"], accept_multiple_files=True,
+                                   help="File names must start with agents, positions, safety_exits or trades.")
+        if uploads and st.button("Import", type="primary"):
+            report = ImportReport()
+            # agents first so child rows can attach to imported agents
+            tables = {name: t for t, name in FILE_NAMES.items()}
+            order = list(FILE_NAMES)
+            stem = lambda up: up.name.rsplit(".", 1)[0].removeprefix("crowdlike-")
+            try:
+                for up in sorted(uploads, key=lambda up: order.index(tables[stem(up)]) if stem(up) in tables else len(order)):
+                    target = tables.get(stem(up))
+                    if target is None:
+                        st.warning(f"Skipped {up.name}: unknown table.")
+                        continue
+                    fmt = "parquet" if up.name.endswith(".parquet") else "csv"
+                    source = io.BytesIO(up.getvalue())
+                    if fmt == "csv":
+                        source = io.TextIOWrapper(source, encoding="utf-8", newline="")
+                    import_table(target, source, registry, fmt=fmt, errors="skip", report=report)
+            except BulkError as e:
+                st.error(f"Import failed: {e}")
+            else:
+                session.cache["bulk_import"] = report
+                st.rerun()
+        report = session.cache.get("bulk_import")
+        if report is not None:
+            st.success("Imported " + ", ".join(f"{n} {t}" for t, n in report.rows.items()) + ".")
+            for t, n in report.skipped.items():
+                st.warning(f"{n} invalid {t} row(s) skipped.")
+            for t, n in report.orphans.items():
+                st.warning(f"{n} {t} row(s) reference unknown agents.")
+            for msg in report.errors[:5]:
+                st.caption(msg)
+
+    spacer()
+    card("""
+      <div class="c-h c-mb1">Session Memory</div>
+      <div class="c-muted">Memory held for this session and across all sessions on this server. Idle sessions are moved to disk.</div>
+    """)
+    store = session_store()
+    rows = store.report()
+    totals = store.totals(rows)
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        st.metric("This session", f"{session.nbytes() / 1024:,.1f} KB")
+    with m2:
+        st.metric("Sessions (resident)", f"{totals['sessions']} ({totals['resident']})")
+    with m3:
+        st.metric("All sessions in memory", f"{totals['bytes'] / 1024:,.1f} KB")
+    with m4:
+        st.metric("On disk", f"{totals['diskBytes'] / 1024:,.1f} KB")
+    with st.expander("Per-session breakdown", expanded=False):
+        st.dataframe(pd.DataFrame(sorted(rows, key=lambda r: -r["bytes"])[:50]), use_container_width=True, hide_index=True)
+
 router = {
     "home": page_home,
     "dashboard": page_dashboard,
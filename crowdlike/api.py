@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime as dt
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from crowdlike.data import Agent, calculate_crowd_metrics, generate_leaderboard, generate_mock_agents, generate_mock_user
+from crowdlike.market import MarketCache
+from crowdlike.registry import AgentFilter, AgentRegistry
+from crowdlike.snapshot import SnapshotError, load_fleet
+
+# Read-only JSON API over a shared fleet:
+#   python -m crowdlike.api --snapshot fleet.snap --port 8765
+#   python -m crowdlike.api --mock 10000
+#
+#   GET /health
+#   GET /agents?offset=0&limit=50&status=active&strategy=swing
+#   GET /agents/<id>
+#   GET /portfolios/<agent id>
+#   GET /leaderboard?offset=0&limit=10
+#   GET /crowd
+#   GET /market
+
+MAX_LIMIT = 500
+DEFAULT_LIMIT = 50
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def _json_default(o: Any) -> Any:
+    if isinstance(o, (dt.datetime, dt.date)):
+        return o.isoformat()
+    raise TypeError(f"not JSON serializable: {type(o).__name__}")
+
+def to_json(data: Any) -> bytes:
+    return json.dumps(data, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+def agent_summary(a: Agent) -> dict:
+    return {
+        "id": a.id,
+        "botId": a.botId,
+        "name": a.name,
+        "status": a.status,
+        "strategy": a.strategy.type,
+        "copyMode": a.strategy.copyMode,
+        "riskness": a.riskness,
+        "totalValue": a.portfolio.totalValue,
+        "profitPercent": a.performance.totalProfitPercent,
+        "winRate": a.performance.winRate,
+    }
+
+@dataclasses.dataclass
+class Response:
+    status: int
+    body: bytes
+    etag: Optional[str] = None
+    gzipped: Optional[bytes] = None
+    maxAge: int = 0
+
+class DataStore:
+    # The fleet served by the API. With a snapshot path the file is re-read when its mtime
+    # changes, so any tool that writes snapshots can publish to every API reader.
+    def __init__(self, registry: AgentRegistry, snapshot: Optional[str] = None, market: Optional[MarketCache] = None,
+                 check_interval: float = 2.0):
+        self.registry = registry
+        self.snapshot = snapshot
+        self.market = market or MarketCache()
+        self.check_interval = check_interval
+        self._generation = 0
+        self.reload_error: Optional[str] = None
+        self._mtime = os.path.getmtime(snapshot) if snapshot else 0.0
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_snapshot(cls, path: str, **kw: Any) -> "DataStore":
+        _, agents = load_fleet(path)
+        return cls(AgentRegistry(agents), snapshot=path, **kw)
+
+    def refresh(self) -> None:
+        if not self.snapshot or time.monotonic() - self._checked < self.check_interval:
+            return
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.path.getmtime(self.snapshot)
+            except OSError:
+                return
+            if mtime != self._mtime:
+                try:
+                    _, agents = load_fleet(self.snapshot)
+                except (OSError, SnapshotError) as e:
+                    # mid-write or unreadable: keep serving the previous fleet, retry next check
+                    self.reload_error = f"{type(e).__name__}: {e}"
+                    return
+                self.registry = AgentRegistry(agents)
+                self._mtime = mtime
+                self._generation += 1
+                self.reload_error = None
+
+    @property
+    def version(self) -> str:
+        return f"{self._generation}.{self.registry.version}"
+
+class ResponseCache:
+    # Encoded responses keyed by (route, data version, params); shared by all request threads.
+    def __init__(self, max_entries: int = 512):
+        self._entries: "OrderedDict[Tuple[Any, ...], Response]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Tuple[Any, ...], build: Callable[[], Any], max_age: int = 0) -> Response:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit
+        body = to_json(build())
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        resp = Response(200, body, etag=etag, gzipped=gzip.compress(body, 5) if len(body) > 1024 else None, maxAge=max_age)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = resp
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return resp
+
+def _int(query: Dict[str, List[str]], name: str, default: int, lo: int = 0, hi: Optional[int] = None) -> int:
+    raw = query.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    if value < lo or (hi is not None and value > hi):
+        raise ApiError(400, f"'{name}' out of range")
+    return value
+
+def _page(items: List[Any], offset: int, limit: int, render: Callable[[Any], Any]) -> dict:
+    page = items[offset:offset + limit]
+    nxt = offset + limit if offset + limit < len(items) else None
+    return {"total": len(items), "offset": offset, "limit": limit, "next": nxt, "items": [render(x) for x in page]}
+
+class CrowdlikeAPI:
+    def __init__(self, store: DataStore, cache: Optional[ResponseCache] = None):
+        self.store = store
+        self.cache = cache or ResponseCache()
+        self._ranked: Tuple[str, List[Any]] = ("", [])
+        self._lock = threading.Lock()
+
+    def _leaderboard(self, version: str) -> List[Any]:
+        # full ranking is computed once per data version and paginated from memory
+        with self._lock:
+            if self._ranked[0] != version:
+                agents = self.store.registry.agents
+                self._ranked = (version, generate_leaderboard(agents, size=len(agents)) if agents else [])
+            return self._ranked[1]
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Response:
+        self.store.refresh()
+        v = self.store.version
+        reg = self.store.registry
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["health"]:
+            return Response(200, to_json({"ok": True, "version": v, "agents": len(reg),
+                                          "reloadError": self.store.reload_error}))
+
+        if parts == ["agents"]:
+            offset = _int(query, "offset", 0)
+            limit = _int(query, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+            statuses = frozenset(query.get("status", [])) or None
+            strategies = frozenset(query.get("strategy", [])) or None
+            def build() -> dict:
+                agents = reg.agents
+                if statuses or strategies:
+                    agents = reg.select(AgentFilter(statuses=statuses, strategies=strategies))
+                return _page(agents, offset, limit, agent_summary)
+            return self.cache.get_or_build(("agents", v, offset, limit, statuses, strategies), build)
+
+        if len(parts) == 2 and parts[0] in ("agents", "portfolios"):
+            agent = reg.get(parts[1])
+            if agent is None:
+                raise ApiError(404, f"agent '{parts[1]}' not found")
+            obj = agent if parts[0] == "agents" else agent.portfolio
+            return self.cache.get_or_build((parts[0], v, agent.id), lambda: dataclasses.asdict(obj))
+
+        if parts == ["leaderboard"]:
+            offset = _int(query, "offset", 0)
+            limit = _int(query, "limit", 10, 1, MAX_LIMIT)
+            return self.cache.get_or_build(
+                ("leaderboard", v, offset, limit),
+                lambda: _page(self._leaderboard(v), offset, limit, dataclasses.asdict),
+            )
+
+        if parts == ["crowd"]:
+            return self.cache.get_or_build(("crowd", v), lambda: dataclasses.asdict(calculate_crowd_metrics(reg.agents)))
+
+        if parts == ["market"]:
+            market = self.store.market
+            data = market.get()
+            return self.cache.get_or_build(
+                ("market", market.version),
+                lambda: {"live": market.live, "items": data},
+                max_age=int(market.ttl),
+            )
+
+        raise ApiError(404, "not found")
+
+class _Handler(BaseHTTPRequestHandler):
+    api: CrowdlikeAPI
+    server_version = "crowdlike-api/1"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        try:
+            resp = self.api.handle(url.path, parse_qs(url.query))
+        except ApiError as e:
+            self._send(e.status, to_json({"error": str(e)}), {"Content-Type": "application/json"})
+            return
+        except Exception as e:
+            self.log_error("unhandled error for %s: %r", url.path, e)
+            self._send(500, to_json({"error": "internal error"}), {"Content-Type": "application/json"})
+            return
+        headers = {"Content-Type": "application/json", "Cache-Control": f"public, max-age={resp.maxAge}"}
+        if resp.etag:
+            headers["ETag"] = resp.etag
+            if resp.etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                self._send(304, b"", headers)
+                return
+        body = resp.body
+        if resp.gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = resp.gzipped
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+        self._send(resp.status, body, headers)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+def make_server(api: CrowdlikeAPI, host: str = "127.0.0.1", port: int = 8765, quiet: bool = False) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"api": api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.quiet = quiet  # type: ignore[attr-defined]
+    return server
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m crowdlike.api", description="Crowdlike read-only JSON API")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--snapshot", help="fleet snapshot to serve (reloaded when the file changes)")
+    p.add_argument("--mock", type=int, default=100, help="serve N mock agents when no snapshot is given")
+    p.add_argument("--market-ttl", type=float, default=30.0)
+    p.add_argument("--quiet", action="store_true")
+    args = p.parse_args(argv)
+
+    market = MarketCache(ttl=args.market_ttl)
+    if args.snapshot:
+        store = DataStore.from_snapshot(args.snapshot, market=market)
+    else:
+        store = DataStore(AgentRegistry(generate_mock_agents(args.mock, user_id=generate_mock_user().id)), market=market)
+    server = make_server(CrowdlikeAPI(store), args.host, args.port, quiet=args.quiet)
+    print(f"crowdlike api serving {len(store.registry)} agents on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
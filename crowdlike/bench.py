@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import argparse
+import atexit
+import copy
+import gc
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import datetime as dt
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+from crowdlike.data import (
+    Agent,
+    generate_mock_agents,
+    calculate_crowd_metrics,
+    generate_leaderboard,
+)
+
+# Usage:
+#   python -m crowdlike.bench --max-size 100000 --out bench_report.json
+#   python -m crowdlike.bench --save-baseline bench_baseline.json
+#   python -m crowdlike.bench --baseline bench_baseline.json --fail-on-regression
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+REPORT_VERSION = 1
+POOL_SIZE = 10_000
+SEED = 1234
+
+# setup(n) prepares inputs outside the timed region and returns the callable to time
+Setup = Callable[[int], Callable[[], object]]
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Setup
+    max_size: int = DEFAULT_SIZES[-1]
+    group: str = ""
+
+@dataclass
+class BenchResult:
+    name: str
+    group: str
+    n: int
+    status: str = "ok"
+    seconds: Optional[float] = None
+    perItemNs: Optional[float] = None
+    peakBytes: Optional[int] = None
+    baselineSeconds: Optional[float] = None
+    ratio: Optional[float] = None
+    regression: bool = False
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def register(name: str, max_size: int = DEFAULT_SIZES[-1], group: str = "") -> Callable[[Setup], Setup]:
+    def deco(setup: Setup) -> Setup:
+        BENCHMARKS[name] = Benchmark(name=name, setup=setup, max_size=max_size, group=group or name)
+        return setup
+    return deco
+
+_pool: List[Agent] = []
+
+def fleet(n: int) -> List[Agent]:
+    # Large populations reuse a fixed pool of distinct agents by reference so that
+    # setup stays cheap and the measured functions still see n list entries.
+    global _pool
+    if not _pool:
+        state = random.getstate()
+        random.seed(SEED)
+        _pool = generate_mock_agents(POOL_SIZE)
+        random.setstate(state)
+    if n <= len(_pool):
+        return _pool[:n]
+    reps, rem = divmod(n, len(_pool))
+    return _pool * reps + _pool[:rem]
+
+def distinct_fleet(n: int) -> List[Agent]:
+    # Private deep copies with unique ids, for benchmarks that mutate or index by id.
+    out: List[Agent] = []
+    for start in range(0, n, POOL_SIZE):
+        chunk = copy.deepcopy(fleet(min(POOL_SIZE, n - start)))
+        for i, a in enumerate(chunk, start=start + 1):
+            a.id = a.portfolio.agentId = f"agent_{i}"
+        out.extend(chunk)
+    return out
+
+_scratch: Optional[str] = None
+
+def scratch_path(name: str) -> str:
+    # Files written during setup live in one private temp directory removed at exit.
+    global _scratch
+    if _scratch is None:
+        _scratch = tempfile.mkdtemp(prefix="crowdlike-bench-")
+        atexit.register(shutil.rmtree, _scratch, True)
+    return os.path.join(_scratch, name)
+
+# --------- Built-in benchmarks ----------
+@register("generate_mock_agents", max_size=100_000)
+def _bench_generate(n: int) -> Callable[[], object]:
+    return lambda: generate_mock_agents(n)
+
+@register("calculate_crowd_metrics")
+def _bench_crowd(n: int) -> Callable[[], object]:
+    agents = fleet(n)
+    return lambda: calculate_crowd_metrics(agents)
+
+@register("generate_leaderboard", group="generate_leaderboard")
+def _bench_leaderboard(n: int) -> Callable[[], object]:
+    agents = fleet(n)
+    return lambda: generate_leaderboard(agents, size=10)
+
+@register("generate_leaderboard[size=n]", max_size=1_000_000, group="generate_leaderboard")
+def _bench_leaderboard_full(n: int) -> Callable[[], object]:
+    agents = fleet(n)
+    return lambda: generate_leaderboard(agents, size=n)
+
+@register("snapshot.save_fleet", max_size=1_000_000)
+def _bench_snapshot_save(n: int) -> Callable[[], object]:
+    from crowdlike.snapshot import save_fleet
+    agents = fleet(n)
+    buf = io.BytesIO()
+    def run() -> object:
+        buf.seek(0)
+        buf.truncate()
+        return save_fleet(buf, agents)
+    return run
+
+@register("snapshot.load_fleet", max_size=1_000_000)
+def _bench_snapshot_load(n: int) -> Callable[[], object]:
+    from crowdlike.snapshot import save_fleet, load_fleet
+    path = scratch_path(f"fleet-{n}.snap")
+    save_fleet(path, fleet(n))
+    return lambda: load_fleet(path)
+
+@register("execution.run_tick", max_size=1_000_000)
+def _bench_execution(n: int) -> Callable[[], object]:
+    from crowdlike.execution import ExecutionEngine, Order, default_books
+    # private copy: ticks mutate portfolios, which must not leak into the shared pool
+    agents = copy.deepcopy(fleet(min(n, POOL_SIZE)))
+    for a in agents:
+        a.status = "active"
+    prices = {p.symbol: p.currentPrice for a in agents for p in a.portfolio.positions}
+    orders = [Order(a.id, a.portfolio.positions[0].symbol, "buy" if i % 3 else "sell", 0.01)
+              for i, a in zip(range(n), itertools.cycle(agents))]
+    def run() -> object:
+        engine = ExecutionEngine(default_books(prices))
+        engine.submit_many(orders)
+        return engine.run_tick(agents, now=dt.datetime(2024, 1, 1))
+    return run
+
+@register("risk.compute_risk", max_size=100_000)
+def _bench_risk(n: int) -> Callable[[], object]:
+    from crowdlike.risk import compute_risk
+    agents = fleet(n)
+    return lambda: compute_risk(agents)
+
+@register("registry.bulk_pause", max_size=100_000)
+def _bench_registry_pause(n: int) -> Callable[[], object]:
+    from crowdlike.registry import AgentRegistry, AgentFilter
+    reg = AgentRegistry(distinct_fleet(n))
+    sel = AgentFilter(minRisk=50)
+    return lambda: reg.pause(sel)
+
+@register("coach.compose_reply", max_size=100_000)
+def _bench_coach(n: int) -> Callable[[], object]:
+    # index build is setup; the timed reply should stay flat as n grows
+    from crowdlike.coach import InsightIndex, compose_reply
+    agents = distinct_fleet(n)
+    index = InsightIndex(agents, calculate_crowd_metrics(agents))
+    prompts = ["how can I improve my strategy", "which agent is best", "drawdown risk"]
+    return lambda: [compose_reply(p, index) for p in prompts]
+
+@register("ticks.ingest", max_size=10_000_000)
+def _bench_ticks(n: int) -> Callable[[], object]:
+    # n = ticks pushed through queue -> drain -> ring buffers in 64k batches
+    from crowdlike.ticks import SimulatedFeed, TickPipeline
+    batch = min(n, 65_536)
+    codes, ts, price, volume = SimulatedFeed().next_batch(batch)
+    def run() -> object:
+        pipe = TickPipeline(queue_capacity=batch)
+        for done in range(0, n, batch):
+            k = min(batch, n - done)
+            pipe.publish_batch(codes[:k], ts[:k], price[:k], volume[:k])
+            pipe.drain()
+        return pipe
+    return run
+
+@register("sweep.run_sweep", max_size=100_000)
+def _bench_sweep(n: int) -> Callable[[], object]:
+    # n = parameter variants; no cache so every variant is backtested
+    from crowdlike.sweep import PriceHistory, random_search, run_sweep
+    history = PriceHistory.demo()
+    variants = random_search(n)
+    return lambda: run_sweep(variants, history)
+
+@register("bulk.import_trades", max_size=1_000_000)
+def _bench_bulk_import(n: int) -> Callable[[], object]:
+    # n = trade rows in a CSV, attached to 1k agents
+    from crowdlike.bulk import import_table
+    from crowdlike.registry import AgentRegistry
+    owners = distinct_fleet(1_000)
+    path = scratch_path(f"trades-{n}.csv")
+    start = dt.datetime(2024, 1, 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,agentId,symbol,side,amount,price,timestamp\n")
+        for i in range(n):
+            ts = (start + dt.timedelta(seconds=i)).isoformat()
+            f.write(f"trade_{i},{owners[i % len(owners)].id},BTC,{'buy' if i % 2 else 'sell'},0.01,43000.0,{ts}\n")
+    def run() -> object:
+        for a in owners:
+            a.portfolio.trades = []
+        return import_table("trades", path, AgentRegistry(owners))
+    return run
+
+@register("copytrade.fan_out", max_size=1_000_000)
+def _bench_copytrade(n: int) -> Callable[[], object]:
+    # n = followers of one leader; a single leader buy is fanned out to all of them
+    import numpy as np
+    from crowdlike.copytrade import CopyEngine
+    from crowdlike.execution import Order
+    from crowdlike.registry import AgentRegistry
+    agents = distinct_fleet(n + 1)
+    for a in agents:
+        a.status = "active"
+        for ex in a.settings.safetyExits:
+            ex.triggeredAt = None
+    leader = agents[0]
+    engine = CopyEngine(AgentRegistry(agents))
+    engine.follow_many((a.id for a in agents[1:]), leader.id)
+    sym = leader.portfolio.positions[0].symbol
+    prices = {sym: leader.portfolio.positions[0].currentPrice}
+    order = Order(leader.id, sym, "buy", leader.portfolio.positions[0].amount)
+    # fan-out debits follower cash and room; restore them so every run copies the same trade
+    saved = [(col, col.copy()) for col in (engine._cash, engine._hold, engine._copied)]
+    def run() -> object:
+        for col, orig in saved:
+            np.copyto(col, orig)
+        return engine.fan_out([order], prices, feeBps=10)
+    return run
+
+# --------- Runner ----------
+def _time_once(fn: Callable[[], object]) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def _peak_once(fn: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def run_benchmark(bench: Benchmark, sizes: List[int], repeat: int = 3, budget: float = 30.0,
+                  memory: bool = True) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    last: Optional[BenchResult] = None
+    for n in sizes:
+        res = BenchResult(name=bench.name, group=bench.group, n=n)
+        if n > bench.max_size:
+            res.status = "skipped:max_size"
+        elif last is not None and last.seconds is not None and last.seconds * (n / last.n) > budget:
+            # assume at least linear growth from the previous size
+            res.status = "skipped:budget"
+        else:
+            random.seed(SEED)
+            fn = bench.setup(n)
+            first = _time_once(fn)
+            runs = [first] + [_time_once(fn) for _ in range(repeat - 1 if first * repeat < budget else 0)]
+            res.seconds = min(runs)
+            res.perItemNs = res.seconds / n * 1e9
+            if memory and res.seconds * 5 < budget:
+                res.peakBytes = _peak_once(fn)
+            del fn
+            last = res
+        results.append(res)
+    return results
+
+def scaling_exponents(results: List[BenchResult]) -> Dict[str, Optional[float]]:
+    # Least-squares slope of log(time) vs log(n): ~1.0 is linear, >1.1 hints at N log N or worse.
+    by_name: Dict[str, List[BenchResult]] = {}
+    for r in results:
+        if r.seconds and r.n >= 1_000:
+            by_name.setdefault(r.name, []).append(r)
+    out: Dict[str, Optional[float]] = {}
+    for name in {r.name for r in results}:
+        pts = [(math.log(r.n), math.log(r.seconds)) for r in by_name.get(name, []) if r.seconds]
+        if len(pts) < 2:
+            out[name] = None
+            continue
+        mx = sum(x for x, _ in pts) / len(pts)
+        my = sum(y for _, y in pts) / len(pts)
+        den = sum((x - mx) ** 2 for x, _ in pts)
+        out[name] = round(sum((x - mx) * (y - my) for x, y in pts) / den, 3) if den else None
+    return out
+
+def compare(results: List[BenchResult], baseline: dict, threshold: float = 0.25, min_seconds: float = 1e-3) -> List[BenchResult]:
+    base = {(r["name"], r["n"]): r for r in baseline.get("results", []) if r.get("seconds")}
+    regressions: List[BenchResult] = []
+    for r in results:
+        b = base.get((r.name, r.n))
+        if b is None or r.seconds is None:
+            continue
+        r.baselineSeconds = b["seconds"]
+        r.ratio = r.seconds / b["seconds"]
+        # sub-millisecond timings are too noisy to gate on
+        if r.ratio > 1 + threshold and r.seconds >= min_seconds:
+            r.regression = True
+            regressions.append(r)
+    return regressions
+
+def build_report(results: List[BenchResult], regressions: List[BenchResult], threshold: float) -> dict:
+    return {
+        "version": REPORT_VERSION,
+        "createdAt": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "threshold": threshold,
+        "results": [asdict(r) for r in results],
+        "scaling": scaling_exponents(results),
+        "regressions": [f"{r.name}@{r.n}" for r in regressions],
+    }
+
+def _fmt_bytes(n: Optional[int]) -> str:
+    if n is None:
+        return "-"
+    for unit in ["B","KB","MB","GB"]:
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TB"
+
+def format_table(results: List[BenchResult]) -> str:
+    lines = [f"{'benchmark':34} {'n':>10} {'time':>11} {'ns/item':>10} {'peak':>8} {'vs base':>8}"]
+    for r in results:
+        if r.seconds is None:
+            lines.append(f"{r.name:34} {r.n:>10} {r.status:>11}")
+            continue
+        ratio = f"{r.ratio:.2f}x" if r.ratio is not None else "-"
+        flag = " !" if r.regression else ""
+        lines.append(f"{r.name:34} {r.n:>10} {r.seconds*1e3:>9.2f}ms {r.perItemNs:>10.0f} {_fmt_bytes(r.peakBytes):>8} {ratio:>8}{flag}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m crowdlike.bench", description="Crowdlike data micro-benchmarks")
+    p.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=DEFAULT_SIZES)
+    p.add_argument("--max-size", type=int, default=None, help="drop sizes above this")
+    p.add_argument("--only", action="append", default=[], help="benchmark name prefix (repeatable)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--budget", type=float, default=30.0, help="seconds allowed per single run")
+    p.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak measurement")
+    p.add_argument("--baseline", help="baseline report to compare against")
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio before flagging")
+    p.add_argument("--save-baseline", help="write this run as the new baseline")
+    p.add_argument("--out", help="write JSON report here (default: stdout)")
+    p.add_argument("--fail-on-regression", action="store_true")
+    p.add_argument("--list", action="store_true")
+    args = p.parse_args(argv)
+
+    if args.list:
+        for b in BENCHMARKS.values():
+            print(f"{b.name}  (max n={b.max_size})")
+        return 0
+
+    sizes = [n for n in args.sizes if args.max_size is None or n <= args.max_size]
+    selected = [b for b in BENCHMARKS.values() if not args.only or any(b.name.startswith(o) for o in args.only)]
+
+    results: List[BenchResult] = []
+    for b in selected:
+        results.extend(run_benchmark(b, sizes, repeat=args.repeat, budget=args.budget, memory=not args.no_memory))
+
+    regressions: List[BenchResult] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), threshold=args.threshold)
+
+    report = build_report(results, regressions, args.threshold)
+    print(format_table(results), file=sys.stderr)
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(payload)
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(report['regressions'])}", file=sys.stderr)
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import chain, islice, repeat
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from crowdlike.data import Agent, AgentPerformance, AgentSettings, AgentStrategy, Portfolio, Position, SafetyExit, Trade
+from crowdlike.registry import AgentRegistry
+from crowdlike.snapshot import (
+    AGENT_COLUMNS,
+    BOOL,
+    CAT,
+    CHILD_TABLES,
+    ENUM,
+    PERFORMANCE_COLUMNS,
+    PORTFOLIO_COLUMNS,
+    SETTINGS_COLUMNS,
+    STR,
+    STRATEGY_COLUMNS,
+    TIME,
+    Column,
+    _gc_paused,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet support is optional
+    pa = pq = None
+
+# Bulk import/export of a fleet as flat tables, one file per table:
+#
+#   agents         one row per agent; columns as in the snapshot format ("strategy.type", ...)
+#   positions      agentId + Position fields
+#   safetyExits    agentId + SafetyExit fields
+#   trades         Trade fields (Trade already carries agentId)
+#
+# Files stream in chunks of `chunk_size` rows in both directions. Each chunk is validated
+# column-at-a-time against the dataclass schema and turned into objects with map(), then
+# inserted into the registry as one batch.
+
+DEFAULT_CHUNK_SIZE = 65_536
+FILE_NAMES: Dict[str, str] = {"agents": "agents", "positions": "positions", "safetyExits": "safety_exits", "trades": "trades"}
+CHILD_CLASSES: Dict[str, type] = {"positions": Position, "safetyExits": SafetyExit, "trades": Trade}
+OPTIONAL = {"strategy.copyMode", "lastTradeAt", "triggeredAt"}
+REQUIRED_TEXT = {"id", "botId", "agentId"}
+CHECKS: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    "riskness": (lambda v: 0 <= v <= 100, "must be between 0 and 100"),
+    "amount": (lambda v: v >= 0, "must not be negative"),
+    "price": (lambda v: v >= 0, "must not be negative"),
+    "threshold": (lambda v: v >= 0, "must not be negative"),
+}
+MAX_REPORTED_ERRORS = 20
+
+_PARENT: Column = ("agentId", STR, "", ())
+
+class BulkError(ValueError):
+    pass
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise BulkError("Parquet support requires pyarrow (pip install pyarrow)")
+
+def table_columns(table: str) -> List[Column]:
+    if table == "agents":
+        return AGENT_COLUMNS
+    if table not in CHILD_TABLES:
+        raise BulkError(f"unknown table '{table}'")
+    cols = CHILD_TABLES[table][1]
+    return cols if any(c[0] == "agentId" for c in cols) else [_PARENT, *cols]
+
+def _format(target: Any, fmt: Optional[str]) -> str:
+    if fmt is None:
+        name = os.fspath(target) if isinstance(target, (str, bytes)) or hasattr(target, "__fspath__") else ""
+        fmt = "parquet" if str(name).lower().endswith((".parquet", ".pq")) else "csv"
+    if fmt not in ("csv", "parquet"):
+        raise BulkError(f"unsupported format '{fmt}'")
+    return fmt
+
+# --------- export ----------
+def _extract(table: str, agents: Sequence[Agent]) -> Dict[str, list]:
+    cols = table_columns(table)
+    parents: List[str] = []
+    if table == "agents":
+        rows: Sequence[Any] = agents
+    else:
+        lists = list(map(attrgetter(CHILD_TABLES[table][0]), agents))
+        rows = list(chain.from_iterable(lists))
+        parents = list(chain.from_iterable(map(repeat, (a.id for a in agents), map(len, lists))))
+    return {name: list(map(attrgetter(attr), rows)) if attr else parents for name, _, attr, _ in cols}
+
+def _csv_value(kind: str) -> Callable[[Any], Any]:
+    if kind == TIME:
+        return lambda t: "" if t is None else t.isoformat()
+    if kind == BOOL:
+        return lambda b: "true" if b else "false"
+    if kind == ENUM:
+        return lambda v: "" if v is None else v
+    return lambda v: v
+
+def _arrow_type(kind: str) -> Any:
+    return {STR: pa.string(), CAT: pa.string(), ENUM: pa.string(), TIME: pa.timestamp("us"), BOOL: pa.bool_(),
+            "d": pa.float64(), "i": pa.int64()}[kind]
+
+class _CsvSink:
+    def __init__(self, target: Any, cols: List[Column]):
+        self._own = not hasattr(target, "write")
+        self._f = open(target, "w", newline="", encoding="utf-8") if self._own else target
+        self._cols = cols
+        self._enc = [_csv_value(kind) for _, kind, _, _ in cols]
+        self._w = csv.writer(self._f)
+        self._w.writerow([c[0] for c in cols])
+
+    def write(self, data: Dict[str, list]) -> None:
+        encoded = [list(map(enc, data[c[0]])) if c[1] in (TIME, BOOL, ENUM) else data[c[0]] for c, enc in zip(self._cols, self._enc)]
+        self._w.writerows(zip(*encoded))
+
+    def close(self) -> None:
+        if self._own:
+            self._f.close()
+
+class _ParquetSink:
+    def __init__(self, target: Any, cols: List[Column]):
+        _require_pyarrow()
+        self._schema = pa.schema([(name, _arrow_type(kind)) for name, kind, _, _ in cols])
+        self._w = pq.ParquetWriter(target, self._schema)
+
+    def write(self, data: Dict[str, list]) -> None:
+        self._w.write_table(pa.Table.from_pydict(data, schema=self._schema))
+
+    def close(self) -> None:
+        self._w.close()
+
+def export_table(table: str, agents: Iterable[Agent], target: Any, fmt: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    # Writes one table for `agents` to a path or open file; returns the number of rows.
+    cols = table_columns(table)
+    sink = (_ParquetSink if _format(target, fmt) == "parquet" else _CsvSink)(target, cols)
+    rows = 0
+    try:
+        it = iter(agents)
+        for chunk in iter(lambda: list(islice(it, chunk_size)), []):
+            data = _extract(table, chunk)
+            sink.write(data)
+            rows += len(data[cols[0][0]])
+    finally:
+        sink.close()
+    return rows
+
+def export_fleet(directory: str, agents: Sequence[Agent], fmt: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    os.makedirs(directory, exist_ok=True)
+    return {table: export_table(table, agents, os.path.join(directory, f"{name}.{fmt}"), fmt, chunk_size)
+            for table, name in FILE_NAMES.items()}
+
+# --------- import ----------
+@dataclass
+class ImportReport:
+    rows: Dict[str, int] = field(default_factory=dict)
+    skipped: Dict[str, int] = field(default_factory=dict)
+    orphans: Dict[str, int] = field(default_factory=dict)  # child rows whose agent is unknown
+    errors: List[str] = field(default_factory=list)
+
+    def _add(self, counter: Dict[str, int], table: str, n: int) -> None:
+        counter[table] = counter.get(table, 0) + n
+
+def _read_chunks(source: Any, fmt: str, chunk_size: int) -> Iterator[Dict[str, list]]:
+    if fmt == "parquet":
+        _require_pyarrow()
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pydict()
+        return
+    own = not hasattr(source, "read")
+    f = open(source, newline="", encoding="utf-8") if own else source
+    try:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        for rows in iter(lambda: list(islice(reader, chunk_size)), []):
+            if set(map(len, rows)) != {len(header)}:
+                bad = next(i for i, r in enumerate(rows) if len(r) != len(header))
+                raise BulkError(f"line {reader.line_num - len(rows) + bad + 1}: expected {len(header)} fields")
+            yield dict(zip(header, map(list, zip(*rows))))
+    finally:
+        if own:
+            f.close()
+
+def _naive(t: dt.datetime) -> dt.datetime:
+    # The fleet stores naive timestamps; offsets such as "+02:00" are converted to naive UTC.
+    return t if t.tzinfo is None else t.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+def _fromiso(v: str) -> dt.datetime:
+    return _naive(dt.datetime.fromisoformat(v))
+
+def _parse_time(v: Any) -> Optional[dt.datetime]:
+    if isinstance(v, dt.datetime):
+        return _naive(v)
+    if v is None or v == "":
+        return None
+    return _fromiso(v)
+
+_BOOLS = {"true": True, "false": False, "1": True, "0": False, "True": True, "False": False, True: True, False: False, 1: True, 0: False}
+
+def _converter(name: str, kind: str, values: Tuple[str, ...]) -> Callable[[Any], Any]:
+    optional = name.rsplit(".", 1)[-1] in OPTIONAL or name in OPTIONAL
+    if kind == ENUM:
+        lookup: Dict[Any, Any] = {v: v for v in values}
+        if optional:
+            lookup[""] = lookup[None] = None
+        return lookup.__getitem__
+    if kind == BOOL:
+        return _BOOLS.__getitem__
+    if kind == "d":
+        return float
+    if kind == "i":
+        return int
+    if kind == TIME:
+        if optional:
+            return _parse_time
+        def required_time(v: Any) -> dt.datetime:
+            t = _parse_time(v)
+            if t is None:
+                raise ValueError("missing")
+            return t
+        return required_time
+    if name.rsplit(".", 1)[-1] in REQUIRED_TEXT:
+        def required_text(v: Any) -> str:
+            if v is None or v == "":
+                raise ValueError("missing")
+            return str(v)
+        return required_text
+    return str
+
+def _convert(name: str, kind: str, conv: Callable[[Any], Any], data: list) -> Optional[list]:
+    # Whole-column conversion with C-level map(); None if any value fails.
+    try:
+        if kind in (STR, CAT) and name.rsplit(".", 1)[-1] in REQUIRED_TEXT:
+            out = list(map(str, data))
+            return None if "" in out or None in data else out
+        if kind == TIME:
+            # timestamps repeat a lot; parse each distinct value once
+            uniq = set(data)
+            parse = _fromiso if all(isinstance(v, str) and v for v in uniq) else conv
+            cache = dict(zip(uniq, map(parse, uniq)))
+            return list(map(cache.__getitem__, data))
+        return list(map(conv, data))
+    except (ValueError, TypeError, KeyError):
+        return None
+
+def _validate(table: str, raw: Dict[str, list], first_row: int, errors: str,
+              report: ImportReport, seen: Optional[Set[str]] = None) -> Tuple[Dict[str, list], int]:
+    # Converts every column with one map() call; only a failing column is rescanned row by
+    # row to find the offending rows. Returns (columns, number of rows kept). `seen` holds the
+    # agent ids accepted so far in this import; a repeated id is an invalid row.
+    cols = table_columns(table)
+    missing = [c[0] for c in cols if c[0] not in raw]
+    if missing:
+        raise BulkError(f"{table}: missing column(s) {', '.join(missing)}")
+    n = len(raw[cols[0][0]])
+    out: Dict[str, list] = {}
+    bad: Dict[int, str] = {}
+    for name, kind, _, values in cols:
+        conv = _converter(name, kind, values)
+        data = raw[name]
+        out[name] = _convert(name, kind, conv, data)  # type: ignore[assignment]
+        check = CHECKS.get(name)
+        if out[name] is not None and check is not None and not all(map(check[0], out[name])):
+            out[name] = None  # type: ignore[assignment]
+        if out[name] is None:
+            col = []
+            for i, v in enumerate(data):
+                try:
+                    c = conv(v)
+                    if check is not None and not check[0](c):
+                        raise ValueError(check[1])
+                except (ValueError, TypeError, KeyError) as e:
+                    c = None
+                    detail = f": {e}" if isinstance(e, ValueError) and str(e) else ""
+                    bad.setdefault(i, f"{table} row {first_row + i}: column '{name}' has invalid value {v!r}{detail}")
+                col.append(c)
+            out[name] = col
+    if seen is not None:
+        ids = out["id"]
+        if len(set(ids)) != n or not seen.isdisjoint(ids):
+            for i, aid in enumerate(ids):
+                if i in bad:
+                    continue
+                if aid in seen:
+                    bad[i] = f"{table} row {first_row + i}: duplicate agent id {aid!r}"
+                else:
+                    seen.add(aid)
+        else:
+            seen.update(aid for i, aid in enumerate(ids) if i not in bad) if bad else seen.update(ids)
+    if not bad:
+        return out, n
+    if errors == "raise":
+        raise BulkError(bad[min(bad)])
+    report._add(report.skipped, table, len(bad))
+    report.errors.extend(list(bad.values())[:max(0, MAX_REPORTED_ERRORS - len(report.errors))])
+    keep = [i for i in range(n) if i not in bad]
+    return {k: list(map(v.__getitem__, keep)) for k, v in out.items()}, len(keep)
+
+def _build_agents(c: Dict[str, list], n: int) -> List[Agent]:
+    group = lambda cols: [c[col[0]] for col in cols]
+    p_agent, p_usdc, p_total, p_updated = group(PORTFOLIO_COLUMNS)
+    s_max, s_trades, s_auto = group(SETTINGS_COLUMNS)
+    empty = lambda: ([] for _ in range(n))
+    return list(map(
+        Agent,
+        c["id"], c["botId"], c["name"], c["userId"],
+        map(AgentStrategy, *group(STRATEGY_COLUMNS)),
+        c["riskness"], c["status"],
+        map(Portfolio, p_agent, p_usdc, p_total, empty(), empty(), p_updated),
+        map(AgentSettings, s_max, s_trades, s_auto, empty()),
+        map(AgentPerformance, *group(PERFORMANCE_COLUMNS)),
+        c["createdAt"], c["lastTradeAt"],
+    ))
+
+def iter_table(table: str, source: Any, fmt: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               errors: str = "raise", report: Optional[ImportReport] = None) -> Iterator[Tuple[List[str], list]]:
+    # Streams validated objects as (parent agent ids, objects) chunks; for the agents table
+    # the ids are the agents' own ids.
+    if errors not in ("raise", "skip"):
+        raise BulkError("errors must be 'raise' or 'skip'")
+    report = report if report is not None else ImportReport()
+    cols = table_columns(table)
+    chunks = _read_chunks(source, _format(source, fmt), chunk_size)
+    seen: Optional[Set[str]] = set() if table == "agents" else None
+    first_row = 1
+    while True:
+        # parsing and construction only create acyclic objects; keep the collector out of it
+        with _gc_paused():
+            raw = next(chunks, None)
+            if raw is None:
+                return
+            size = len(next(iter(raw.values()), []))
+            c, n = _validate(table, raw, first_row, errors, report, seen)
+            first_row += size
+            if table == "agents":
+                objs: list = _build_agents(c, n)
+            else:
+                objs = list(map(CHILD_CLASSES[table], *(c[name] for name, _, attr, _ in cols if attr)))
+        report._add(report.rows, table, n)
+        yield c["agentId"] if "agentId" in c else c["id"], objs
+
+def import_table(table: str, source: Any, registry: AgentRegistry, fmt: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, errors: str = "raise",
+                 report: Optional[ImportReport] = None) -> ImportReport:
+    # Inserts one table into `registry`, one batch per chunk. Imported agents replace agents
+    # with the same id; child rows are appended to their agent's lists.
+    report = report if report is not None else ImportReport()
+    with _gc_paused():
+        _import(table, iter_table(table, source, fmt, chunk_size, errors, report), registry, report)
+    return report
+
+def _import(table: str, chunks: Iterator[Tuple[List[str], list]], registry: AgentRegistry, report: ImportReport) -> None:
+    for ids, objs in chunks:
+        if table == "agents":
+            existing = [aid for aid in ids if aid in registry]
+            if existing:
+                registry.delete(existing)
+            registry.add_many(objs)
+            continue
+        path = CHILD_TABLES[table][0]
+        groups: Dict[str, list] = defaultdict(list)
+        for aid, obj in zip(ids, objs):
+            groups[aid].append(obj)
+        touched: List[Agent] = []
+        for aid, items in groups.items():
+            agent = registry.get(aid)
+            if agent is None:
+                report._add(report.orphans, table, len(items))
+                continue
+            attrgetter(path)(agent).extend(items)
+            touched.append(agent)
+        registry.changed(touched)
+
+def import_fleet(directory: str, registry: Optional[AgentRegistry] = None, fmt: str = "csv",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, errors: str = "raise") -> Tuple[AgentRegistry, ImportReport]:
+    # Loads whichever of the table files exist in `directory`; agents first so children attach.
+    registry = registry if registry is not None else AgentRegistry()
+    report = ImportReport()
+    for table, name in FILE_NAMES.items():
+        path = os.path.join(directory, f"{name}.{fmt}")
+        if os.path.exists(path):
+            import_table(table, path, registry, fmt, chunk_size, errors, report)
+    return registry, report
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from crowdlike.data import Agent, CrowdMetrics
+
+# Win-rate buckets as (label, lower bound inclusive)
+WIN_RATE_BUCKETS: List[Tuple[str, float]] = [("<40%", 0.0), ("40–55%", 40.0), ("55–70%", 55.0), ("70%+", 70.0)]
+OUTLIER_SIGMA = 1.5
+
+@dataclass(frozen=True)
+class AgentFacts:
+    id: str
+    name: str
+    profitPercent: float
+    maxDrawdown: float
+    crowdDeviation: float
+    winRate: float
+    riskness: int
+    status: str
+
+    @classmethod
+    def of(cls, a: Agent) -> "AgentFacts":
+        p = a.performance
+        return cls(a.id, a.name, p.totalProfitPercent, p.maxDrawdown, p.crowdDeviation, p.winRate, a.riskness, a.status)
+
+def _bucket(win_rate: float) -> int:
+    b = 0
+    for i, (_, lo) in enumerate(WIN_RATE_BUCKETS):
+        if win_rate >= lo:
+            b = i
+    return b
+
+class _Ranked:
+    # Heap with lazy invalidation: an update pushes a new (value, id, stamp) entry and entries
+    # whose stamp is no longer current are skipped on read and dropped on compaction.
+    def __init__(self, sign: float, stamps: Dict[str, int]):
+        self._sign = sign
+        self._stamps = stamps
+        self._heap: List[Tuple[float, str, int]] = []
+
+    def _live(self, e: Tuple[float, str, int]) -> bool:
+        return self._stamps.get(e[1]) == e[2]
+
+    def push(self, value: float, agent_id: str, stamp: int) -> None:
+        heapq.heappush(self._heap, (self._sign * value, agent_id, stamp))
+        if len(self._heap) > 64 and len(self._heap) > 4 * len(self._stamps):
+            self._heap = [e for e in self._heap if self._live(e)]
+            heapq.heapify(self._heap)
+
+    def top(self, k: int) -> List[str]:
+        heap = self._heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+        # best-first walk down the heap tree: O(k log k) without scanning the whole heap
+        out: List[str] = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(out) < k:
+            e, i = heapq.heappop(frontier)
+            if self._live(e):
+                out.append(e[1])
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < len(heap):
+                    heapq.heappush(frontier, (heap[c], c))
+        return out
+
+class InsightIndex:
+    # Per-fleet aggregates the coach answers from. Updated incrementally from registry change
+    # events, so every read is O(1) or O(k log n) instead of a rescan of the fleet.
+    def __init__(self, agents: Sequence[Agent] = (), crowd: Optional[CrowdMetrics] = None):
+        self._lock = threading.RLock()
+        self.crowd = crowd
+        self._facts: Dict[str, AgentFacts] = {}
+        self._stamps: Dict[str, int] = {}
+        self._stamp = 0
+        self._sum = {"profit": 0.0, "drawdown": 0.0, "drawdown2": 0.0, "winRate": 0.0, "risk": 0.0}
+        self._active = 0
+        self._buckets = [0] * len(WIN_RATE_BUCKETS)
+        self._best = _Ranked(-1.0, self._stamps)
+        self._worst = _Ranked(1.0, self._stamps)
+        self._drawdown = _Ranked(-1.0, self._stamps)
+        self._deviation = _Ranked(-1.0, self._stamps)
+        self.version = 0
+        self.apply(list(agents), [])
+
+    def _add(self, f: AgentFacts, sign: int) -> None:
+        s = self._sum
+        s["profit"] += sign * f.profitPercent
+        s["drawdown"] += sign * f.maxDrawdown
+        s["drawdown2"] += sign * f.maxDrawdown ** 2
+        s["winRate"] += sign * f.winRate
+        s["risk"] += sign * f.riskness
+        self._active += sign * (f.status == "active")
+        self._buckets[_bucket(f.winRate)] += sign
+
+    def apply(self, upserted: List[Agent], removed: List[str]) -> None:
+        # Registry listener: (upserted agents, removed ids).
+        with self._lock:
+            for aid in removed:
+                old = self._facts.pop(aid, None)
+                if old is not None:
+                    self._add(old, -1)
+                    del self._stamps[aid]
+            for a in upserted:
+                new = AgentFacts.of(a)
+                old = self._facts.get(a.id)
+                if old == new:
+                    continue
+                if old is not None:
+                    self._add(old, -1)
+                self._facts[a.id] = new
+                self._add(new, 1)
+                self._stamp += 1
+                self._stamps[a.id] = self._stamp
+                self._best.push(new.profitPercent, a.id, self._stamp)
+                self._worst.push(new.profitPercent, a.id, self._stamp)
+                self._drawdown.push(new.maxDrawdown, a.id, self._stamp)
+                self._deviation.push(new.crowdDeviation, a.id, self._stamp)
+            self.version += 1
+
+    def set_crowd(self, crowd: CrowdMetrics) -> None:
+        with self._lock:
+            self.crowd = crowd
+            self.version += 1
+
+    # --------- queries ----------
+    def __len__(self) -> int:
+        return len(self._facts)
+
+    def _mean(self, key: str) -> float:
+        return self._sum[key] / len(self._facts) if self._facts else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            n = len(self._facts)
+            dd_mean = self._mean("drawdown")
+            dd_var = max(0.0, self._sum["drawdown2"] / n - dd_mean ** 2) if n else 0.0
+            return {
+                "count": n,
+                "active": self._active,
+                "avgProfitPercent": self._mean("profit"),
+                "avgWinRate": self._mean("winRate"),
+                "avgRiskness": self._mean("risk"),
+                "avgDrawdown": dd_mean,
+                "drawdownStd": dd_var ** 0.5,
+            }
+
+    def _ranked(self, ranked: _Ranked, k: int) -> List[AgentFacts]:
+        with self._lock:
+            return [self._facts[aid] for aid in ranked.top(k)]
+
+    def best(self, k: int = 1) -> List[AgentFacts]:
+        return self._ranked(self._best, k)
+
+    def worst(self, k: int = 1) -> List[AgentFacts]:
+        return self._ranked(self._worst, k)
+
+    def most_deviating(self, k: int = 3) -> List[AgentFacts]:
+        return self._ranked(self._deviation, k)
+
+    def drawdown_outliers(self, k: int = 3) -> List[AgentFacts]:
+        s = self.summary()
+        limit = s["avgDrawdown"] + OUTLIER_SIGMA * s["drawdownStd"]
+        return [f for f in self._ranked(self._drawdown, k) if f.maxDrawdown > limit]
+
+    def win_rate_buckets(self) -> Dict[str, int]:
+        with self._lock:
+            return {label: n for (label, _), n in zip(WIN_RATE_BUCKETS, self._buckets)}
+
+# --------- response generation ----------
+def _names(facts: List[AgentFacts]) -> str:
+    return ", ".join(f"**{f.name}**" for f in facts) or "none"
+
+def compose_reply(prompt: str, index: InsightIndex) -> str:
+    lower = prompt.lower()
+    s = index.summary()
+    crowd = index.crowd
+    if not s["count"]:
+        return "You don't have any agents yet. Create one on the Agents page and I'll start tracking it."
+
+    if "strategy" in lower or "improve" in lower or "better" in lower:
+        buckets = index.win_rate_buckets()
+        crowd_risk = f"{crowd.avgRiskness}" if crowd else f"{s['avgRiskness']:.0f}"
+        crowd_pos = f"{crowd.avgPositionSize:.0f}%" if crowd else "20%"
+        return (
+            f"Based on your current performance (avg {s['avgProfitPercent']:.2f}% profit), I recommend:\n\n"
+            f"1. **Diversify Risk Levels**: Balance aggressive (risk 70–100) and conservative (risk 20–40) agents.\n\n"
+            f"2. **Leverage Crowd Learning**: The crowd's average risk is {crowd_risk}. Agents closer to this tend to perform consistently. "
+            f"Furthest from the crowd: {_names(index.most_deviating(3))}.\n\n"
+            f"3. **Monitor Win Rates**: {buckets['55–70%'] + buckets['70%+']} of {s['count']} agents are above 55%. "
+            f"Adjust underperformers like {_names(index.worst(2))}.\n\n"
+            f"4. **Position Sizing**: Crowd average is {crowd_pos} per trade. Align your agents with or slightly beat this.\n\n"
+            "Would you like specific recommendations for any particular agent?"
+        )
+    if "risk" in lower or "drawdown" in lower:
+        outliers = index.drawdown_outliers(3)
+        return (
+            f"Average max drawdown across your agents is {s['avgDrawdown']:.1f}% (σ {s['drawdownStd']:.1f}).\n\n"
+            + (f"Drawdown outliers: {_names(outliers)}. Consider lowering their riskness or tightening the max-drawdown exit.\n\n"
+               if outliers else "No agent is a drawdown outlier right now.\n\n")
+            + f"Most deviating from the crowd: {_names(index.most_deviating(3))}."
+        )
+    if "agent" in lower or "best" in lower or "worst" in lower:
+        best = index.best(1)
+        worst = index.worst(1)
+        return (
+            f"Your strongest agent right now is **{best[0].name if best else 'N/A'}**"
+            + (f" ({best[0].profitPercent:+.2f}%)" if best else "")
+            + (f"; the weakest is **{worst[0].name}** ({worst[0].profitPercent:+.2f}%)" if worst and len(index) > 1 else "")
+            + ".\n\nFor next steps, consider:\n"
+            "- Lowering risk on any agent with high drawdown\n"
+            "- Increasing max trades/day only for agents with consistent win rates\n"
+            "- Keeping deviation from the crowd under your safety threshold"
+        )
+    return (
+        "I can help with:\n\n"
+        "- Strategy tuning (risk, position size, trade frequency)\n"
+        "- Identifying your best/worst agents\n"
+        "- Drawdown and crowd-deviation outliers\n"
+        "- Understanding crowd similarity and momentum\n\n"
+        "Ask me about a specific agent or goal."
+    )
+
+STREAM_CHUNKS = 3  # a reply is streamed in at most this many pieces
+
+def stream_reply(prompt: str, index: InsightIndex, parts: int = STREAM_CHUNKS) -> Iterator[str]:
+    # Composes the reply on the caller's thread (O(k log n), well under a millisecond) and yields
+    # it in at most `parts` pieces split at paragraph breaks, so streaming it costs a few deltas.
+    paras = compose_reply(prompt, index).split("\n\n")
+    step = -(-len(paras) // max(1, parts))
+    for i in range(0, len(paras), step):
+        yield ("\n\n" if i else "") + "\n\n".join(paras[i:i + step])
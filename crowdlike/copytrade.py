@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from crowdlike.data import Agent, CopyMode
+from crowdlike.execution import ExecutionEngine, Order, TickResult
+from crowdlike.registry import AgentRegistry
+from crowdlike.snapshot import _gc_paused
+
+# Copy trading. Followers subscribe to leaders; every leader order is fanned out to all of the
+# leader's followers in one vectorized step per (leader, symbol, side), according to each
+# follower's copyMode:
+#
+#   mirror    copy the trade scaled by follower equity / leader equity
+#   rules     as mirror, further scaled by follower riskness / leader riskness (capped at 2x)
+#   strategy  copy the leader's resulting allocation: trade towards the same portfolio weight
+#
+# Copies are then clamped to the follower's maxPositionSize (% of equity), cash and holdings,
+# and dropped for followers that are not active, have a tripped safety exit or have used up
+# maxTradesPerDay. Follower state lives in columns with one row per follower and each leader
+# keeps an index of its followers' rows, so a fan-out costs O(followers of that leader)
+# regardless of fleet size. Copies are not copied again, so chains and cycles cannot amplify.
+
+MODES: Tuple[str, ...] = ("mirror", "rules", "strategy")
+MIN_NOTIONAL = 1.0  # USD; smaller copies are dropped rather than sent as dust orders
+MAX_RULES_SCALE = 2.0
+
+def _tripped(a: Agent) -> bool:
+    return any(ex.enabled and ex.triggeredAt is not None for ex in a.settings.safetyExits)
+
+class CopyEngine:
+    def __init__(self, registry: AgentRegistry):
+        self.registry = registry
+        self._row: Dict[str, int] = {}        # follower id -> row
+        self._ids: List[Optional[str]] = []   # row -> follower id
+        self._free: List[int] = []
+        self._edges: Dict[str, Dict[int, float]] = {}  # leader id -> {follower row: ratio}
+        self._leaders: Dict[str, Set[str]] = {}        # follower id -> leader ids
+        self._index: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # leader id -> (rows, ratios)
+        self._sym: Dict[str, int] = {}
+        self._day = dt.date.today()
+        self._alloc(64, 8)
+        registry.subscribe(self._on_change)
+
+    # --------- follower columns ----------
+    def _alloc(self, rows: int, syms: int) -> None:
+        old = getattr(self, "_equity", None)
+        n = 0 if old is None else len(old)
+        def grow(a: Optional[np.ndarray], dtype: type) -> np.ndarray:
+            out = np.zeros(rows, dtype=dtype)
+            if a is not None:
+                out[:n] = a
+            return out
+        self._equity = grow(old, np.float64)
+        self._cash = grow(getattr(self, "_cash", None), np.float64)
+        self._risk = grow(getattr(self, "_risk", None), np.float64)
+        self._maxpos = grow(getattr(self, "_maxpos", None), np.float64)
+        self._maxtrades = grow(getattr(self, "_maxtrades", None), np.int32)
+        self._copied = grow(getattr(self, "_copied", None), np.int32)
+        self._eligible = grow(getattr(self, "_eligible", None), np.bool_)
+        self._mode = grow(getattr(self, "_mode", None), np.int8)
+        hold = np.zeros((rows, syms))
+        if old is not None:
+            hold[:n, :self._hold.shape[1]] = self._hold
+        self._hold = hold
+
+    def _sym_col(self, symbol: str) -> int:
+        col = self._sym.get(symbol)
+        if col is None:
+            col = self._sym[symbol] = len(self._sym)
+            if col >= self._hold.shape[1]:
+                self._alloc(len(self._equity), 2 * self._hold.shape[1])
+        return col
+
+    def _load(self, rows: Sequence[int], agents: Sequence[Agent]) -> None:
+        # Refresh follower rows from their agents, one column at a time.
+        idx = np.asarray(rows, dtype=np.intp)
+        pfs = [a.portfolio for a in agents]
+        self._equity[idx] = [pf.totalValue for pf in pfs]
+        self._cash[idx] = [pf.usdcBalance for pf in pfs]
+        self._risk[idx] = [a.riskness for a in agents]
+        self._maxpos[idx] = [a.settings.maxPositionSize for a in agents]
+        self._maxtrades[idx] = [a.settings.maxTradesPerDay for a in agents]
+        self._eligible[idx] = [a.status == "active" and not _tripped(a) for a in agents]
+        self._mode[idx] = [MODES.index(a.strategy.copyMode or "mirror") for a in agents]
+        cells = [(r, self._sym_col(p.symbol), p.amount) for r, pf in zip(rows, pfs) for p in pf.positions]
+        self._hold[idx] = 0.0
+        if cells:
+            r, c, amount = zip(*cells)
+            np.add.at(self._hold, (np.asarray(r), np.asarray(c)), amount)
+
+    def _on_change(self, upserted: List[Agent], removed: List[str]) -> None:
+        with _gc_paused():
+            hits = [(self._row[a.id], a) for a in upserted if a.id in self._row]
+            if hits:
+                rows, agents = zip(*hits)
+                self._load(rows, agents)
+        for aid in removed:
+            self.unfollow(aid)
+            for follower in [self._ids[r] for r in self._edges.get(aid, {})]:
+                self.unfollow(follower, aid)  # type: ignore[arg-type]
+
+    # --------- follow graph ----------
+    def _resolve(self, ref: str) -> Optional[Agent]:
+        return self.registry.get(ref) or self.registry.by_bot(ref)
+
+    def follow(self, follower_id: str, leader: str, mode: Optional[CopyMode] = None, ratio: float = 1.0) -> bool:
+        # `leader` is an agent id or botId; `mode` overrides the follower's copyMode.
+        f, lead = self.registry.get(follower_id), self._resolve(leader)
+        if f is None or lead is None or f.id == lead.id or ratio <= 0:
+            return False
+        if mode is not None:
+            f.strategy.copyMode = mode
+        row = self._row.get(f.id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self._ids[row] = f.id
+            else:
+                row = len(self._ids)
+                self._ids.append(f.id)
+                if row >= len(self._equity):
+                    self._alloc(2 * len(self._equity), self._hold.shape[1])
+            self._row[f.id] = row
+            self._copied[row] = 0  # a reused row must not inherit the previous follower's count
+        self._load([row], [f])
+        self._edges.setdefault(lead.id, {})[row] = float(ratio)
+        self._leaders.setdefault(f.id, set()).add(lead.id)
+        self._index.pop(lead.id, None)
+        return True
+
+    def follow_many(self, follower_ids: Iterable[str], leader: str, mode: Optional[CopyMode] = None,
+                    ratio: float = 1.0) -> int:
+        return sum(self.follow(fid, leader, mode, ratio) for fid in follower_ids)
+
+    def unfollow(self, follower_id: str, leader: Optional[str] = None) -> int:
+        # Drop one subscription, or all of the follower's subscriptions when leader is None.
+        row = self._row.get(follower_id)
+        if row is None:
+            return 0
+        leaders = self._leaders.get(follower_id, set())
+        if leader is None:
+            doomed = set(leaders)
+        else:
+            lead = leader if leader in leaders else getattr(self._resolve(leader), "id", None)
+            doomed = {lead} & leaders
+        for lid in doomed:
+            self._edges[lid].pop(row, None)
+            if not self._edges[lid]:
+                del self._edges[lid]
+            self._index.pop(lid, None)
+        leaders -= doomed
+        if not leaders:
+            self._leaders.pop(follower_id, None)
+            del self._row[follower_id]
+            self._ids[row] = None
+            self._eligible[row] = False
+            self._free.append(row)
+        return len(doomed)
+
+    def followers(self, leader: str) -> List[str]:
+        lead = self._resolve(leader)
+        rows = self._edges.get(lead.id, {}) if lead else {}
+        return [self._ids[r] for r in rows]  # type: ignore[misc]
+
+    def leaders(self, follower_id: str) -> List[str]:
+        return sorted(self._leaders.get(follower_id, ()))
+
+    def _rows(self, leader_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        idx = self._index.get(leader_id)
+        if idx is None:
+            edges = self._edges.get(leader_id, {})
+            idx = self._index[leader_id] = (
+                np.fromiter(edges.keys(), dtype=np.intp, count=len(edges)),
+                np.fromiter(edges.values(), dtype=np.float64, count=len(edges)),
+            )
+        return idx
+
+    # --------- fan-out ----------
+    def fan_out(self, orders: Iterable[Order], prices: Dict[str, float], feeBps: float = 0.0,
+                today: Optional[dt.date] = None) -> List[Order]:
+        # Follower orders for a batch of leader orders (or executed trades: anything with
+        # agentId, symbol, side and amount). Follower cash, holdings and daily trade counts are
+        # debited as copies are made, so several leader orders in one batch cannot overspend.
+        today = today or dt.date.today()
+        if today != self._day:
+            self._day = today
+            self._copied[:] = 0
+        groups: Dict[Tuple[str, str, str], float] = {}
+        for o in orders:
+            if o.agentId in self._edges and o.amount > 0:
+                key = (o.agentId, o.symbol, o.side)
+                groups[key] = groups.get(key, 0.0) + o.amount
+        fee = feeBps / 1e4
+        out: List[Order] = []
+        with _gc_paused():
+            for (lid, sym, side), amount in groups.items():
+                lead, px = self.registry.get(lid), prices.get(sym, 0.0)
+                if lead is None or lead.status != "active" or px <= 0 or lead.portfolio.totalValue <= 0:
+                    continue
+                rows, ratio = self._rows(lid)
+                col = self._sym_col(sym)
+                out.extend(self._fan_group(lead, rows, ratio, sym, col, side, amount, px, fee))
+        return out
+
+    def _fan_group(self, lead: Agent, rows: np.ndarray, ratio: np.ndarray, sym: str, col: int,
+                   side: str, amount: float, px: float, fee: float) -> List[Order]:
+        lpf = lead.portfolio
+        sign = 1.0 if side == "buy" else -1.0
+        eq, cash, hold = self._equity[rows], self._cash[rows], self._hold[rows, col]
+        mode = self._mode[rows]
+
+        qty = sign * amount * (eq / lpf.totalValue) * ratio
+        rules = mode == 1
+        if rules.any():
+            qty[rules] *= np.minimum(self._risk[rows[rules]] / max(lead.riskness, 1), MAX_RULES_SCALE)
+        strat = mode == 2
+        if strat.any():
+            held = sum(p.amount for p in lpf.positions if p.symbol == sym)
+            weight = max(held + sign * amount, 0.0) * px / lpf.totalValue
+            qty[strat] = (weight * eq[strat] / px - hold[strat]) * ratio[strat]
+
+        room = np.maximum(self._maxpos[rows] / 100 * eq / px - hold, 0.0)
+        afford = np.maximum(cash, 0.0) / (px * (1 + fee))
+        qty = np.where(qty > 0, np.minimum(qty, np.minimum(room, afford)), np.maximum(qty, -hold))
+        live = self._eligible[rows] & (self._copied[rows] < self._maxtrades[rows])
+        qty[~live | (np.abs(qty) * px < MIN_NOTIONAL)] = 0.0
+
+        hit = np.flatnonzero(qty)
+        if not hit.size:
+            return []
+        r, q = rows[hit], qty[hit]
+        self._hold[r, col] += q
+        self._cash[r] -= q * px * np.where(q > 0, 1 + fee, 1 - fee)
+        self._copied[r] += 1
+        ids = self._ids
+        return [Order(ids[i], sym, "buy" if v > 0 else "sell", abs(v))  # type: ignore[arg-type]
+                for i, v in zip(r.tolist(), q.tolist())]
+
+    def run_tick(self, engine: ExecutionEngine, orders: Sequence[Order],
+                 now: Optional[dt.datetime] = None) -> TickResult:
+        # Submit leader orders together with their copies so both fill in the same tick; only
+        # agents with pending orders are handed to the engine, and the registry is told which
+        # agents traded so follower rows are refreshed from the executed state.
+        now = now or dt.datetime.now()
+        prices = {sym: b.mid for sym, b in engine.books.items()}
+        copies = self.fan_out(orders, prices, engine.feeBps, today=now.date())
+        engine.submit_many(orders)
+        engine.submit_many(copies)
+        with _gc_paused():
+            result = engine.run_tick(self.registry.select(engine.agent_ids()), now)
+            self.registry.changed(self.registry.select({t.agentId for t in result.trades}))
+        return result
@@ -7,6 +7,7 @@ from typing import Literal, Optional, List
 
 StrategyType = Literal["aggressive","conservative","balanced","swing","daytrading","hodl","custom"]
 AgentStatus = Literal["active","paused","exited"]
+CopyMode = Literal["mirror","rules","strategy"]
 
 @dataclass
 class UserSettings:
@@ -84,7 +85,7 @@ class Portfolio:
 @dataclass
 class AgentStrategy:
     type: StrategyType
-    copyMode: Optional[Literal["mirror","rules","strategy"]] = None
+    copyMode: Optional[CopyMode] = None
 
 @dataclass
 class Agent:
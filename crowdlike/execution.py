@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import datetime as dt
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Literal, Optional, Set, Tuple
+
+from crowdlike.data import Agent, Position, Trade
+
+Side = Literal["buy","sell"]
+
+@dataclass
+class Order:
+    agentId: str
+    symbol: str
+    side: Side
+    amount: float  # units of the asset
+
+@dataclass
+class OrderBook:
+    # Synthetic symmetric book: level k sits (spread/2 + k*step) bps away from mid
+    # and holds levelNotional USD of liquidity.
+    symbol: str
+    mid: float
+    spreadBps: float = 5.0
+    levelStepBps: float = 2.0
+    levelNotional: float = 250_000.0
+    levels: int = 50
+    resilience: float = 0.5  # share of price impact that decays before the next tick
+
+    def level_price(self, side: Side, k: int) -> float:
+        bps = self.spreadBps / 2 + k * self.levelStepBps
+        return self.mid * (1 + bps / 1e4) if side == "buy" else self.mid * (1 - bps / 1e4)
+
+    def depth(self) -> float:
+        return self.levelNotional * self.levels / self.mid
+
+    def sweep(self, side: Side, qty: float) -> Tuple[float, float, float]:
+        # Walk the book for `qty` units; returns (filled, vwap, last touched price).
+        if qty <= 0:
+            return 0.0, self.mid, self.mid
+        filled = cost = 0.0
+        last = self.mid
+        level_qty = self.levelNotional / self.mid
+        for k in range(self.levels):
+            take = min(level_qty, qty - filled)
+            last = self.level_price(side, k)
+            filled += take
+            cost += take * last
+            if filled >= qty:
+                break
+        return filled, (cost / filled if filled else self.mid), last
+
+@dataclass
+class SymbolReport:
+    symbol: str
+    midBefore: float
+    midAfter: float
+    buyVolume: float = 0.0
+    sellVolume: float = 0.0
+    crossedVolume: float = 0.0
+    residualVolume: float = 0.0
+    filledResidual: float = 0.0
+    residualVwap: float = 0.0
+    slippageBps: float = 0.0
+    impactBps: float = 0.0
+    fees: float = 0.0
+    orders: int = 0
+    rejected: int = 0
+
+@dataclass
+class TickResult:
+    trades: List[Trade]
+    reports: Dict[str, SymbolReport]
+    rejected: List[Order] = field(default_factory=list)
+
+    @property
+    def strainScore(self) -> float:
+        return strain_score(self.reports.values())
+
+def strain_score(reports: Iterable[SymbolReport], full_scale_bps: float = 50.0) -> float:
+    # Notional-weighted slippage mapped to 0..100 (full_scale_bps of slippage = 100).
+    num = den = 0.0
+    for r in reports:
+        notional = (r.crossedVolume * 2 + r.filledResidual) * r.midBefore
+        num += abs(r.slippageBps) * notional
+        den += notional
+    if not den:
+        return 0.0
+    return min(100.0, num / den / full_scale_bps * 100)
+
+def default_books(prices: Dict[str, float], **kw: float) -> Dict[str, OrderBook]:
+    return {sym: OrderBook(symbol=sym, mid=float(p), **kw) for sym, p in prices.items() if p > 0}
+
+class ExecutionEngine:
+    def __init__(self, books: Dict[str, OrderBook], feeBps: float = 10.0):
+        self.books = books
+        self.feeBps = feeBps
+        self._orders: List[Order] = []
+        self._ids = itertools.count(1)
+        self.tick = 0
+
+    def submit(self, order: Order) -> None:
+        self._orders.append(order)
+
+    def submit_many(self, orders: Iterable[Order]) -> None:
+        self._orders.extend(orders)
+
+    @property
+    def pending(self) -> int:
+        return len(self._orders)
+
+    def agent_ids(self) -> Set[str]:
+        # Agents with pending orders; run_tick only needs these agents.
+        return {o.agentId for o in self._orders}
+
+    def _validate(self, orders: List[Order], by_id: Dict[str, Agent]) -> Tuple[Dict[str, List[Order]], List[Order]]:
+        # Clamp sells to held units and buys to available cash (at the worst level), group by symbol.
+        by_symbol: Dict[str, List[Order]] = {}
+        rejected: List[Order] = []
+        cash = {aid: a.portfolio.usdcBalance for aid, a in by_id.items()}
+        held: Dict[Tuple[str, str], float] = {}
+        fee = self.feeBps / 1e4
+        for o in orders:
+            agent = by_id.get(o.agentId)
+            book = self.books.get(o.symbol)
+            if agent is None or book is None or o.amount <= 0 or agent.status != "active":
+                rejected.append(o)
+                continue
+            if o.side == "sell":
+                key = (o.agentId, o.symbol)
+                if key not in held:
+                    held[key] = next((p.amount for p in agent.portfolio.positions if p.symbol == o.symbol), 0.0)
+                amount = min(o.amount, held[key])
+                held[key] -= amount
+            else:
+                worst = book.level_price("buy", book.levels - 1) * (1 + fee)
+                amount = min(o.amount, cash[o.agentId] / worst)
+                cash[o.agentId] -= amount * worst
+            if amount <= 0:
+                rejected.append(o)
+                continue
+            by_symbol.setdefault(o.symbol, []).append(Order(o.agentId, o.symbol, o.side, amount))
+        return by_symbol, rejected
+
+    def run_tick(self, agents: List[Agent], now: Optional[dt.datetime] = None) -> TickResult:
+        # Net every pending order per symbol, fill the crossing volume at mid, sweep the book
+        # once with the residual, then write all resulting trades in one pass.
+        now = now or dt.datetime.now()
+        orders, self._orders = self._orders, []
+        self.tick += 1
+        by_id = {a.id: a for a in agents}
+        by_symbol, rejected = self._validate(orders, by_id)
+        fee = self.feeBps / 1e4
+
+        fills: List[Tuple[Order, float, float]] = []  # (order, filled units, price)
+        reports: Dict[str, SymbolReport] = {}
+        for sym, group in by_symbol.items():
+            book = self.books[sym]
+            buys = sum(o.amount for o in group if o.side == "buy")
+            sells = sum(o.amount for o in group if o.side == "sell")
+            crossed = min(buys, sells)
+            dominant: Side = "buy" if buys > sells else "sell"
+            residual = abs(buys - sells)
+            filled, vwap, last = book.sweep(dominant, residual)
+
+            dom_total = max(buys, sells)
+            dom_ratio = (crossed + filled) / dom_total if dom_total else 0.0
+            dom_price = (crossed * book.mid + filled * vwap) / (crossed + filled) if crossed + filled else book.mid
+            notional = 0.0
+            for o in group:
+                qty, price = (o.amount * dom_ratio, dom_price) if residual and o.side == dominant else (o.amount, book.mid)
+                fills.append((o, qty, price))
+                notional += qty * price
+
+            rep = SymbolReport(
+                symbol=sym,
+                midBefore=book.mid,
+                midAfter=book.mid,
+                buyVolume=buys,
+                sellVolume=sells,
+                crossedVolume=crossed,
+                residualVolume=residual,
+                filledResidual=filled,
+                residualVwap=vwap,
+                slippageBps=(dom_price / book.mid - 1) * 1e4 if residual else 0.0,
+                fees=notional * fee,
+                orders=len(group),
+            )
+            if filled:
+                # the crowd's net flow moves the mid; part of it persists into the next tick
+                book.mid += (last - book.mid) * (1 - book.resilience)
+            rep.midAfter = book.mid
+            rep.impactBps = (rep.midAfter / rep.midBefore - 1) * 1e4
+            reports[sym] = rep
+
+        trades = self._apply(fills, by_id, now)
+        for o in rejected:
+            if o.symbol in reports:
+                reports[o.symbol].rejected += 1
+        return TickResult(trades=trades, reports=reports, rejected=rejected)
+
+    def _apply(self, fills: List[Tuple[Order, float, float]], by_id: Dict[str, Agent], now: dt.datetime) -> List[Trade]:
+        fee = self.feeBps / 1e4
+        trades: List[Trade] = []
+        touched: Dict[str, Agent] = {}
+        pos_index: Dict[Tuple[str, str], Position] = {}
+        for o, qty, price in fills:
+            if qty <= 0:
+                continue
+            agent = by_id[o.agentId]
+            pf = agent.portfolio
+            if o.agentId not in touched:
+                touched[o.agentId] = agent
+                for p in pf.positions:
+                    pos_index.setdefault((o.agentId, p.symbol), p)
+            notional = qty * price
+            pos = pos_index.get((o.agentId, o.symbol))
+            if o.side == "buy":
+                pf.usdcBalance -= notional * (1 + fee)
+                if pos is None:
+                    pos = Position(symbol=o.symbol, amount=0.0, entryPrice=price, currentPrice=price)
+                    pf.positions.append(pos)
+                    pos_index[(o.agentId, o.symbol)] = pos
+                pos.entryPrice = (pos.entryPrice * pos.amount + notional) / (pos.amount + qty)
+                pos.amount += qty
+            else:
+                pf.usdcBalance += notional * (1 - fee)
+                pos.amount -= qty
+            trades.append(Trade(
+                id=f"trade_{self.tick}_{next(self._ids)}",
+                agentId=o.agentId,
+                symbol=o.symbol,
+                side=o.side,
+                amount=qty,
+                price=price,
+                timestamp=now,
+            ))
+
+        # one trade-list append and one revaluation per touched agent
+        per_agent: Dict[str, List[Trade]] = {}
+        for t in trades:
+            per_agent.setdefault(t.agentId, []).append(t)
+        for aid, agent in touched.items():
+            pf = agent.portfolio
+            pf.positions = [p for p in pf.positions if p.amount > 1e-12]
+            for p in pf.positions:
+                book = self.books.get(p.symbol)
+                if book is not None:
+                    p.currentPrice = book.mid
+            new = per_agent.get(aid, [])
+            pf.trades.extend(new)
+            pf.totalValue = pf.usdcBalance + sum(p.value for p in pf.positions)
+            pf.lastUpdated = now
+            if new:
+                agent.lastTradeAt = now
+                agent.performance.totalTrades += len(new)
+        return trades
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from crowdlike.data import DEFAULT_ASSETS
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+
+# (symbol, display name, reference price in USD) for the offline demo feed
+DEMO_ASSETS: List[Tuple[str, str, float]] = [
+    ("BTC","Bitcoin",43000),
+    ("ETH","Ethereum",2300),
+    ("SOL","Solana",90),
+    ("ADA","Cardano",0.5),
+    ("DOT","Polkadot",7.0),
+    ("BNB","BNB",300),
+    ("XRP","XRP",0.55),
+    ("DOGE","Dogecoin",0.08),
+]
+
+def coingecko_markets(timeout: float = 10):
+    params = {
+        "vs_currency": "usd",
+        "ids": ",".join(cg_id for _, cg_id in DEFAULT_ASSETS),
+        "order": "market_cap_desc",
+        "per_page": 50,
+        "page": 1,
+        "sparkline": "false",
+        "price_change_percentage": "24h",
+    }
+    try:
+        r = requests.get(COINGECKO_MARKETS_URL, params=params, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+    except Exception:
+        return None
+
+# Offline demo feed: a price is a pure function of (symbol, time bucket), so every process and
+# every session sees the same path and a restart replays it. Log price is a sum of three waves
+# with per-symbol phases plus a small hashed jitter.
+DEMO_STEP = 5.0  # seconds per demo price bucket
+SPARK_POINTS = 30  # prices kept per asset for sparklines
+_DAY = 86_400
+
+def _unit(*key: object) -> float:
+    digest = hashlib.blake2b(":".join(map(str, key)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+def demo_price(symbol: str, base: float, t: float, step: float = DEMO_STEP) -> float:
+    k = int(t // step)
+    x = (0.04 * math.sin(2 * math.pi * (k / 720 + _unit(symbol, "a")))
+         + 0.015 * math.sin(2 * math.pi * (k / 97 + _unit(symbol, "b")))
+         + 0.004 * math.sin(2 * math.pi * (k / 13 + _unit(symbol, "c")))
+         + 0.002 * (_unit(symbol, k) - 0.5))
+    return base * math.exp(x)
+
+def demo_markets(now: Optional[float] = None, step: float = DEMO_STEP) -> List[dict]:
+    # Same shape as the CoinGecko payload; deterministic for a given `now`.
+    now = time.time() if now is None else now
+    out = []
+    for sym, name, base in DEMO_ASSETS:
+        price = demo_price(sym, base, now, step)
+        out.append({
+            "name": name,
+            "symbol": sym.lower(),
+            "current_price": price,
+            "price_change_percentage_24h": (price / demo_price(sym, base, now - _DAY, step) - 1) * 100,
+        })
+    return out
+
+def demo_history(symbol: str, now: float, points: int = SPARK_POINTS, spacing: float = DEMO_STEP) -> List[float]:
+    # The `points` demo prices up to `now`, `spacing` seconds apart, oldest first.
+    base = next((b for s, _, b in DEMO_ASSETS if s == symbol), 1.0)
+    return [demo_price(symbol, base, now - i * spacing) for i in range(points - 1, -1, -1)]
+
+class MarketRow(NamedTuple):
+    symbol: str
+    name: str
+    price: float
+    change24h: float
+    spark: Tuple[float, ...]  # last SPARK_POINTS prices, oldest first
+
+class MarketFrame(NamedTuple):
+    # One shared snapshot of the market; `version` increases with every fetch.
+    version: int
+    ts: float
+    live: bool
+    rows: Dict[str, MarketRow]
+
+def frame_deltas(prev: Optional[Dict[str, MarketRow]], frame: MarketFrame) -> Dict[str, float]:
+    # symbol -> price change for every row that differs from the rows a viewer last rendered
+    # (price, 24h change or sparkline); all rows when prev is None. Rows that changed without a
+    # price move map to 0.0.
+    if prev is None:
+        return {sym: 0.0 for sym in frame.rows}
+    return {sym: row.price - prev[sym].price if sym in prev else 0.0
+            for sym, row in frame.rows.items() if prev.get(sym) != row}
+
+class MarketCache:
+    # One upstream fetch per `ttl` seconds shared by every caller; falls back to the demo feed.
+    # Each fetch becomes a MarketFrame with per-asset price history for sparklines.
+    #
+    # The upstream call runs outside the lock: while one caller fetches, the others keep getting
+    # the current frame. After a failed fetch the upstream is not tried again for a backoff that
+    # doubles from `ttl` up to `max_backoff`; the demo feed is served in the meantime.
+    def __init__(self, ttl: float = 30.0, timeout: float = 3.0, points: int = SPARK_POINTS,
+                 offline: bool = False, max_backoff: float = 300.0):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.points = points
+        self.offline = offline
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._data: Optional[List[dict]] = None
+        self._fetched = 0.0
+        self._fetching = False
+        self._retry_at = 0.0
+        self._history: Dict[str, Deque[float]] = {}
+        self._frame: Optional[MarketFrame] = None
+        self.failures = 0  # consecutive failed upstream fetches
+        self.live = False
+        self.version = 0
+
+    def _fetch(self) -> Optional[List[dict]]:
+        if self.offline or time.monotonic() < self._retry_at:
+            return None
+        data = coingecko_markets(timeout=self.timeout)
+        if data is None:
+            self.failures += 1
+            self._retry_at = time.monotonic() + min(self.ttl * 2 ** self.failures, self.max_backoff)
+        else:
+            self.failures = 0
+        return data
+
+    def _apply(self, data: Optional[List[dict]]) -> None:
+        now = time.time()
+        if self.live != (data is not None):
+            self._history.clear()  # live and demo prices do not share a line
+        self.live = data is not None
+        self._data = data if data is not None else demo_markets(now)
+        self._fetched = time.monotonic()
+        self.version += 1
+
+        rows: Dict[str, MarketRow] = {}
+        for d in self._data:
+            sym = str(d.get("symbol", "")).upper()
+            price = float(d.get("current_price") or 0)
+            hist = self._history.get(sym)
+            if hist is None:
+                seed = [] if self.live else demo_history(sym, now, self.points, max(self.ttl, DEMO_STEP))[:-1]
+                hist = self._history[sym] = deque(seed, maxlen=self.points)
+            hist.append(price)
+            rows[sym] = MarketRow(sym, d.get("name", ""), price,
+                                  float(d.get("price_change_percentage_24h") or 0), tuple(hist))
+        self._frame = MarketFrame(self.version, now, self.live, rows)
+
+    def _refresh(self) -> None:
+        with self._lock:
+            stale = self._frame is None or time.monotonic() - self._fetched >= self.ttl
+            if not stale or (self._fetching and self._frame is not None):
+                return
+            self._fetching = True
+        data = None
+        try:
+            data = self._fetch()
+        finally:
+            with self._lock:
+                self._fetching = False
+                self._apply(data)
+
+    def get(self) -> List[dict]:
+        self._refresh()
+        return self._data  # type: ignore[return-value]
+
+    def frame(self) -> MarketFrame:
+        self._refresh()
+        return self._frame  # type: ignore[return-value]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from crowdlike.ui import PAGES
+
+# Bytes sent to the browser per rerun, measured headlessly with Streamlit's AppTest:
+#   python -m crowdlike.payload
+#   python -m crowdlike.payload --pages home agents --no-static
+#
+# The figure is the serialized size of every element delta the script emits on one rerun of
+# a page, which is what crosses the websocket (before transport compression).
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def _walk(node: Any) -> Tuple[int, int]:
+    total = count = 0
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        total += proto.ByteSize()
+        count += 1
+    for child in getattr(node, "children", {}).values():
+        t, c = _walk(child)
+        total += t
+        count += c
+    return total, count
+
+def measure(pages: Optional[List[str]] = None, static: bool = True, app: str = APP) -> Dict[str, Tuple[int, int]]:
+    # page -> (bytes, elements) for a fresh session's first rerun of that page
+    from streamlit.testing.v1 import AppTest
+    out: Dict[str, Tuple[int, int]] = {}
+    for page in pages or [p for p, _, _ in PAGES]:
+        at = AppTest.from_file(app, default_timeout=60)
+        at.session_state["page"] = page
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].value}")
+        out[page] = _walk(at._tree)
+    return out
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m crowdlike.payload", description="Bytes sent per rerun, per page")
+    p.add_argument("--pages", nargs="*", help="pages to measure (default: all)")
+    p.add_argument("--no-static", action="store_true", help="measure with static serving off (CSS inlined)")
+    args = p.parse_args(argv)
+
+    from streamlit import config
+    config.set_option("server.enableStaticServing", not args.no_static)
+    results = measure(args.pages)
+    print(f"{'page':<14}{'bytes':>10}{'elements':>10}")
+    for page, (nbytes, count) in results.items():
+        print(f"{page:<14}{nbytes:>10,}{count:>10}")
+    print(f"{'total':<14}{sum(b for b, _ in results.values()):>10,}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Union
+
+from crowdlike.data import Agent, AgentStatus, StrategyType
+
+_ID_RE = re.compile(r"^agent_(\d+)$")
+
+@dataclass
+class AgentFilter:
+    ids: Optional[Set[str]] = None
+    statuses: Optional[Set[AgentStatus]] = None
+    strategies: Optional[Set[StrategyType]] = None
+    minRisk: int = 0
+    maxRisk: int = 100
+    minProfitPercent: Optional[float] = None
+    maxProfitPercent: Optional[float] = None
+
+    def __call__(self, a: Agent) -> bool:
+        if self.ids is not None and a.id not in self.ids:
+            return False
+        if self.statuses is not None and a.status not in self.statuses:
+            return False
+        if self.strategies is not None and a.strategy.type not in self.strategies:
+            return False
+        if not self.minRisk <= a.riskness <= self.maxRisk:
+            return False
+        p = a.performance.totalProfitPercent
+        if self.minProfitPercent is not None and p < self.minProfitPercent:
+            return False
+        if self.maxProfitPercent is not None and p > self.maxProfitPercent:
+            return False
+        return True
+
+Selector = Union[AgentFilter, Callable[[Agent], bool], Iterable[str]]
+# listener(upserted, removed_ids) is called once per mutation batch
+Listener = Callable[[List[Agent], List[str]], None]
+
+class AgentRegistry:
+    # Agents keyed by id (insertion ordered) and botId, with a monotonic id counter so ids are
+    # never reused after a delete. `version` increases on every mutation and can be used as a
+    # cache key by anything derived from the fleet.
+    def __init__(self, agents: Iterable[Agent] = (), next_id: int = 1):
+        # next_id restores the counter of a registry whose highest ids were deleted before it
+        # was saved; it is raised past any id in `agents` regardless.
+        self._by_id: Dict[str, Agent] = {}
+        self._by_bot: Dict[str, str] = {}
+        self._next = max(1, next_id)
+        self._list: Optional[List[Agent]] = None
+        self._listeners: List[Listener] = []
+        self.version = 0
+        self.add_many(agents)
+
+    # --------- lookup ----------
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, agent_id: object) -> bool:
+        return agent_id in self._by_id
+
+    def __iter__(self) -> Iterator[Agent]:
+        return iter(self.agents)
+
+    def get(self, agent_id: str) -> Optional[Agent]:
+        return self._by_id.get(agent_id)
+
+    def by_bot(self, bot_id: str) -> Optional[Agent]:
+        agent_id = self._by_bot.get(bot_id)
+        return None if agent_id is None else self._by_id[agent_id]
+
+    @property
+    def agents(self) -> List[Agent]:
+        # Ordered list view, rebuilt at most once per version.
+        if self._list is None:
+            self._list = list(self._by_id.values())
+        return self._list
+
+    def select(self, selector: Selector) -> List[Agent]:
+        if callable(selector):
+            return [a for a in self._by_id.values() if selector(a)]
+        return [a for a in map(self._by_id.get, selector) if a is not None]
+
+    # --------- mutation ----------
+    def subscribe(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _touch(self, upserted: Sequence[Agent] = (), removed: Sequence[str] = ()) -> None:
+        self._list = None
+        self.version += 1
+        for fn in self._listeners:
+            fn(list(upserted), list(removed))
+
+    def changed(self, agents: Sequence[Agent]) -> None:
+        # Report agents mutated outside the registry (e.g. by the execution engine).
+        if agents:
+            self._touch(agents)
+
+    @property
+    def next_id(self) -> int:
+        return self._next
+
+    def new_id(self) -> str:
+        agent_id = f"agent_{self._next}"
+        self._next += 1
+        return agent_id
+
+    def _insert(self, agent: Agent, assign_id: bool) -> None:
+        if assign_id or not agent.id or agent.id in self._by_id:
+            agent.id = self.new_id()
+            agent.portfolio.agentId = agent.id
+        else:
+            m = _ID_RE.match(agent.id)
+            if m:
+                self._next = max(self._next, int(m.group(1)) + 1)
+        self._by_id[agent.id] = agent
+        self._by_bot[agent.botId] = agent.id
+
+    def add(self, agent: Agent, assign_id: bool = False) -> Agent:
+        self._insert(agent, assign_id)
+        self._touch([agent])
+        return agent
+
+    def add_many(self, agents: Iterable[Agent], assign_id: bool = False) -> int:
+        added = list(agents)
+        for a in added:
+            self._insert(a, assign_id)
+        if added:
+            self._touch(added)
+        return len(added)
+
+    def remove(self, agent_id: str) -> bool:
+        return self.delete([agent_id]) == 1
+
+    def delete(self, selector: Selector) -> int:
+        doomed = self.select(selector)
+        for a in doomed:
+            del self._by_id[a.id]
+            if self._by_bot.get(a.botId) == a.id:
+                del self._by_bot[a.botId]
+        if doomed:
+            self._touch(removed=[a.id for a in doomed])
+        return len(doomed)
+
+    def update(self, selector: Selector, fn: Callable[[Agent], None]) -> int:
+        # Apply fn to every selected agent in one pass; one version bump for the whole batch.
+        changed = self.select(selector)
+        for a in changed:
+            fn(a)
+        if changed:
+            self._touch(changed)
+        return len(changed)
+
+    def set_status(self, selector: Selector, status: AgentStatus) -> int:
+        def apply(a: Agent) -> None:
+            a.status = status
+        return self.update(selector, apply)
+
+    def pause(self, selector: Selector) -> int:
+        return self.set_status(selector, "paused")
+
+    def resume(self, selector: Selector) -> int:
+        return self.set_status(selector, "active")
+
+    def toggle(self, agent_id: str) -> Optional[AgentStatus]:
+        a = self._by_id.get(agent_id)
+        if a is None:
+            return None
+        a.status = "paused" if a.status == "active" else "active"
+        self._touch([a])
+        return a.status
+
+    def set_riskness(self, selector: Selector, riskness: int) -> int:
+        riskness = max(0, min(100, int(riskness)))
+        def apply(a: Agent) -> None:
+            a.riskness = riskness
+        return self.update(selector, apply)
+
+    def scale_riskness(self, selector: Selector, factor: float) -> int:
+        def apply(a: Agent) -> None:
+            a.riskness = max(0, min(100, int(round(a.riskness * factor))))
+        return self.update(selector, apply)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from crowdlike.data import Agent
+
+TRADING_DAYS = 365  # crypto trades every day
+MARKET_SEED = 20240101
+
+# How much of the common market factor each strategy carries.
+STRATEGY_BETA: Dict[str, float] = {
+    "aggressive": 1.3,
+    "daytrading": 0.6,
+    "swing": 1.0,
+    "balanced": 0.8,
+    "conservative": 0.5,
+    "hodl": 1.1,
+    "custom": 0.9,
+}
+
+def fleet_version(agents: Sequence[Agent]) -> int:
+    # Cheap content fingerprint for callers that do not track a version counter.
+    return hash(tuple((a.id, a.riskness, a.strategy.type, a.performance.totalProfitPercent) for a in agents))
+
+def simulate_returns(agents: Sequence[Agent], days: int = TRADING_DAYS) -> np.ndarray:
+    # Agents do not store a price history yet, so daily returns are synthesised from a shared
+    # market factor plus per-agent noise seeded by agent id (stable when the fleet changes).
+    # Vol scales with riskness and the series is drifted to end on the agent's profit %.
+    n = len(agents)
+    if n == 0:
+        return np.zeros((0, days))
+    market = np.random.default_rng(MARKET_SEED).normal(0.0, 0.02, days)
+    risk = np.fromiter((a.riskness for a in agents), float, n)
+    beta = np.fromiter((STRATEGY_BETA.get(a.strategy.type, 1.0) for a in agents), float, n)
+    target = np.fromiter((a.performance.totalProfitPercent for a in agents), float, n) / 100
+
+    noise = np.empty((n, days))
+    for i, a in enumerate(agents):
+        noise[i] = np.random.default_rng(zlib.crc32(a.id.encode("utf-8"))).standard_normal(days)
+    idio_vol = (0.005 + risk / 100 * 0.03)[:, None]
+    r = beta[:, None] * market[None, :] + idio_vol * noise
+
+    # shift each row so that compounding gives exactly the stored total return
+    log_r = np.log1p(np.clip(r, -0.95, None))
+    shift = (np.log1p(np.clip(target, -0.95, None)) - log_r.sum(axis=1)) / days
+    return np.expm1(log_r + shift[:, None])
+
+def _rolling_std(returns: np.ndarray, window: int) -> np.ndarray:
+    n, t = returns.shape
+    if t < window:
+        return np.zeros((n, 0))
+    c1 = np.cumsum(np.pad(returns, ((0, 0), (1, 0))), axis=1)
+    c2 = np.cumsum(np.pad(returns ** 2, ((0, 0), (1, 0))), axis=1)
+    s1 = c1[:, window:] - c1[:, :-window]
+    s2 = c2[:, window:] - c2[:, :-window]
+    var = (s2 - s1 ** 2 / window) / (window - 1)
+    return np.sqrt(np.clip(var, 0, None))
+
+@dataclass
+class RiskReport:
+    agentIds: List[str]
+    names: List[str]
+    returns: np.ndarray          # (agents, days)
+    annualReturn: np.ndarray
+    volatility: np.ndarray       # annualised
+    sharpe: np.ndarray
+    sortino: np.ndarray
+    var: np.ndarray              # historical one-day VaR, positive = loss
+    cvar: np.ndarray
+    maxDrawdown: np.ndarray      # percent
+    rollingVol: np.ndarray       # (agents, days - window + 1), annualised
+    confidence: float
+    window: int
+
+    def to_frame(self) -> pd.DataFrame:
+        pct = int(round(self.confidence * 100))
+        return pd.DataFrame({
+            "Agent": self.names,
+            "Return %": self.annualReturn * 100,
+            "Volatility %": self.volatility * 100,
+            "Sharpe": self.sharpe,
+            "Sortino": self.sortino,
+            f"VaR {pct}% (1d) %": self.var * 100,
+            f"CVaR {pct}% (1d) %": self.cvar * 100,
+            "Max Drawdown %": self.maxDrawdown,
+        })
+
+    def correlation(self, idx: Optional[Sequence[int]] = None) -> np.ndarray:
+        # Agent-to-agent return correlation. float32 keeps a 5k x 5k matrix at ~100MB.
+        r = self.returns if idx is None else self.returns[np.asarray(idx)]
+        if len(r) == 0:
+            return np.zeros((0, 0), dtype=np.float32)
+        z = r - r.mean(axis=1, keepdims=True)
+        std = z.std(axis=1, keepdims=True)
+        z = np.divide(z, std, out=np.zeros_like(z), where=std > 0).astype(np.float32)
+        corr = z @ z.T / r.shape[1]
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+def compute_risk(agents: Sequence[Agent], returns: Optional[np.ndarray] = None, confidence: float = 0.95,
+                 risk_free: float = 0.0, window: int = 30) -> RiskReport:
+    r = simulate_returns(agents) if returns is None else np.asarray(returns, dtype=float)
+    n, t = r.shape
+    rf = risk_free / TRADING_DAYS
+    excess = r - rf
+
+    mean = excess.mean(axis=1) if t else np.zeros(n)
+    std = r.std(axis=1, ddof=1) if t > 1 else np.zeros(n)
+    downside = np.sqrt((np.minimum(excess, 0) ** 2).mean(axis=1)) if t else np.zeros(n)
+    ann = np.sqrt(TRADING_DAYS)
+    sharpe = np.divide(mean, std, out=np.zeros(n), where=std > 0) * ann
+    sortino = np.divide(mean, downside, out=np.zeros(n), where=downside > 0) * ann
+
+    # historical VaR/CVaR from the sorted tail of each row
+    k = max(1, int(np.ceil((1 - confidence) * t))) if t else 0
+    tail = np.partition(r, k - 1, axis=1)[:, :k] if t else np.zeros((n, 0))
+    var = -tail.max(axis=1) if t else np.zeros(n)
+    cvar = -tail.mean(axis=1) if t else np.zeros(n)
+
+    wealth = np.cumprod(1 + r, axis=1)
+    peak = np.maximum.accumulate(np.maximum(wealth, 1.0), axis=1)
+    max_dd = (1 - wealth / peak).max(axis=1) * 100 if t else np.zeros(n)
+
+    return RiskReport(
+        agentIds=[a.id for a in agents],
+        names=[a.name for a in agents],
+        returns=r,
+        annualReturn=(wealth[:, -1] - 1) if t else np.zeros(n),
+        volatility=std * ann,
+        sharpe=sharpe,
+        sortino=sortino,
+        var=var,
+        cvar=cvar,
+        maxDrawdown=max_dd,
+        rollingVol=_rolling_std(r, window) * ann,
+        confidence=confidence,
+        window=window,
+    )
+
+class RiskEngine:
+    # Memoises reports per (data version, parameters); share one instance across sessions.
+    def __init__(self, max_entries: int = 8):
+        self._cache: "OrderedDict[Tuple[Hashable, ...], RiskReport]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def report(self, agents: Sequence[Agent], version: Optional[Hashable] = None, confidence: float = 0.95,
+               risk_free: float = 0.0, window: int = 30) -> RiskReport:
+        key = (fleet_version(agents) if version is None else version, confidence, risk_free, window)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return cached
+        rep = compute_risk(agents, confidence=confidence, risk_free=risk_free, window=window)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = rep
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return rep
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from crowdlike.registry import AgentRegistry
+from crowdlike.snapshot import SnapshotError, load_fleet, save_fleet
+
+# Per-session state budget. Heavy per-session objects live in a process-wide SessionStore
+# rather than in st.session_state, keyed by a session id:
+#
+#   resident  registry, chat tail and derived caches in memory
+#   spilled   idle for `idle_ttl`: registry written to a snapshot, chat tail appended to the
+#             session's chat log, caches dropped; the next access restores the registry
+#   expired   idle for `expire_after`: files deleted and the slot forgotten
+#
+# An idle session therefore costs a few hundred bytes however large its fleet or chat is.
+
+log = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TTL = 15 * 60
+DEFAULT_EXPIRE_AFTER = 24 * 3600
+CHAT_KEEP = 20  # chat messages kept in memory; older ones are paged out to disk
+SPILL_BACKOFF_MAX = 3600.0  # seconds; a slot whose spill keeps failing is retried at most this rarely
+
+# topic label -> prompt keywords, used to summarise archived chat turns
+CHAT_TOPICS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("strategy", ("strategy", "improve", "better")),
+    ("risk", ("risk", "drawdown")),
+    ("agents", ("agent", "best", "worst")),
+]
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    # Approximate retained size of an object graph; shared objects are counted once.
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif hasattr(o, "__dict__"):
+            stack.append(vars(o))
+        elif hasattr(o, "__slots__"):
+            stack.extend(getattr(o, s) for s in o.__slots__ if hasattr(o, s))
+    return total
+
+class ChatMessage(NamedTuple):
+    role: str
+    content: str
+    ts: float  # epoch seconds
+
+class ChatHistory:
+    # Keeps the last `keep` messages in memory. Older messages are appended to a JSON-lines
+    # log (one seek offset per message stays in memory) and folded into a topic summary.
+    def __init__(self, path: Optional[str] = None, keep: int = CHAT_KEEP):
+        self.path = path
+        self.keep = keep
+        self._recent: List[ChatMessage] = []
+        self._offsets = array("Q")
+        self.archived = 0
+        self.topics: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            self._index_log()
+
+    def _index_log(self) -> None:
+        with open(self.path, "rb") as f:  # type: ignore[arg-type]
+            pos = 0
+            for line in f:
+                self._offsets.append(pos)
+                pos += len(line)
+        self.archived = len(self._offsets)
+        for m in self.page(0, self.archived):
+            self._count_topic(m)
+
+    def __len__(self) -> int:
+        return self.archived + len(self._recent)
+
+    def _count_topic(self, m: ChatMessage) -> None:
+        if m.role != "user":
+            return
+        lower = m.content.lower()
+        label = next((t for t, words in CHAT_TOPICS if any(w in lower for w in words)), "other")
+        self.topics[label] = self.topics.get(label, 0) + 1
+
+    def append(self, role: str, content: str, ts: Optional[float] = None) -> ChatMessage:
+        m = ChatMessage(role, content, time.time() if ts is None else ts)
+        self._recent.append(m)
+        if len(self._recent) > 2 * self.keep:
+            # compact in batches so the log is not touched on every message
+            self._archive(len(self._recent) - self.keep)
+        return m
+
+    def _archive(self, n: int) -> None:
+        old, self._recent = self._recent[:n], self._recent[n:]
+        for m in old:
+            self._count_topic(m)
+        self.archived += len(old)
+        if not self.path:
+            return
+        with open(self.path, "ab") as f:
+            pos = f.tell()
+            for m in old:
+                line = json.dumps(m, separators=(",", ":")).encode("utf-8") + b"\n"
+                self._offsets.append(pos)
+                f.write(line)
+                pos += len(line)
+
+    def spill(self) -> None:
+        self._archive(len(self._recent))
+
+    def recent(self) -> List[ChatMessage]:
+        return list(self._recent)
+
+    def page(self, start: int, count: int) -> List[ChatMessage]:
+        # Archived messages [start, start + count), oldest first; read from the log on demand.
+        if not self.path or start >= len(self._offsets):
+            return []
+        stop = min(start + count, len(self._offsets))
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[start])
+            return [ChatMessage(*json.loads(f.readline())) for _ in range(stop - start)]
+
+    def summary(self) -> str:
+        if not self.archived:
+            return ""
+        asked = sum(self.topics.values())
+        parts = ", ".join(f"{t} ×{n}" for t, n in sorted(self.topics.items(), key=lambda kv: -kv[1]))
+        return f"{self.archived} earlier messages" + (f" · {asked} questions: {parts}" if asked else "")
+
+    def clear(self) -> None:
+        self._recent = []
+        self._offsets = array("Q")
+        self.archived = 0
+        self.topics = {}
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+class SessionSlot:
+    def __init__(self, sid: str, directory: str, factory: Callable[[], AgentRegistry]):
+        self.sid = sid
+        self.snapshot = os.path.join(directory, f"{sid}.snap")
+        self.chat = ChatHistory(os.path.join(directory, f"{sid}.chat.jsonl"))
+        self.cache: Dict[str, Any] = {}  # derived objects that can be rebuilt (indexes, reports)
+        self.lastSeen = time.monotonic()
+        self.spills = 0
+        self.restores = 0
+        self.spillFailures = 0
+        self.spillError: Optional[str] = None
+        self.retryAt = 0.0  # monotonic time before which the sweep leaves a failed slot alone
+        self._factory = factory
+        self._registry: Optional[AgentRegistry] = None
+        self._next_id = 1  # id counter of the spilled registry; not recoverable from the snapshot
+        self._lock = threading.RLock()
+        self._size: Tuple[Any, int] = (None, 0)
+
+    @property
+    def resident(self) -> bool:
+        return self._registry is not None
+
+    @property
+    def registry(self) -> AgentRegistry:
+        with self._lock:
+            if self._registry is None:
+                restored = None
+                if os.path.exists(self.snapshot):
+                    try:
+                        _, restored = load_fleet(self.snapshot)
+                    except (OSError, SnapshotError):
+                        restored = None
+                if restored is not None:
+                    self._registry = AgentRegistry(restored, next_id=self._next_id)
+                    self.restores += 1
+                else:
+                    self._registry = self._factory()
+            return self._registry
+
+    @registry.setter
+    def registry(self, value: AgentRegistry) -> None:
+        with self._lock:
+            self._registry = value
+            self.cache.clear()
+
+    def spill(self, idle_ttl: Optional[float] = None, now: Optional[float] = None) -> bool:
+        # With idle_ttl, only spill if the session is still idle once the slot lock is held: a
+        # viewer who came back after the sweep looked must keep the registry they are editing.
+        with self._lock:
+            if idle_ttl is not None:
+                now = time.monotonic() if now is None else now
+                if now - self.lastSeen < idle_ttl:
+                    return False
+            if self._registry is None and not self.cache and not self.chat.recent():
+                return False
+            if self._registry is not None:
+                save_fleet(self.snapshot, self._registry.agents)
+                self._next_id = self._registry.next_id
+                self._registry = None
+            self.cache.clear()
+            self.chat.spill()
+            self.spills += 1
+            return True
+
+    def discard(self) -> None:
+        with self._lock:
+            self._registry = None
+            self.cache.clear()
+            self.chat.clear()
+            if os.path.exists(self.snapshot):
+                os.unlink(self.snapshot)
+
+    def nbytes(self) -> int:
+        # Resident bytes; recomputed only when the fleet or chat changed.
+        with self._lock:
+            reg = self._registry
+            key = (id(reg), reg.version if reg else None, len(self.chat), tuple(self.cache))
+            if self._size[0] != key:
+                seen: set = set()
+                size = deep_sizeof(self.chat.recent(), seen) + deep_sizeof(self.chat._offsets, seen)
+                size += deep_sizeof(self.cache, seen)
+                if reg is not None:
+                    size += deep_sizeof(reg, seen)
+                self._size = (key, size)
+            return self._size[1]
+
+    def disk_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in (self.snapshot, self.chat.path) if p and os.path.exists(p))
+
+class SessionStore:
+    # Process-wide home of per-session heavy state; see the module comment for the lifecycle.
+    def __init__(self, directory: Optional[str] = None, idle_ttl: float = DEFAULT_IDLE_TTL,
+                 expire_after: float = DEFAULT_EXPIRE_AFTER, sweep_interval: float = 30.0):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "crowdlike-sessions")
+        os.makedirs(self.directory, exist_ok=True)
+        self.idle_ttl = idle_ttl
+        self.expire_after = expire_after
+        self.sweep_interval = sweep_interval
+        self._slots: Dict[str, SessionSlot] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def slot(self, sid: str, factory: Callable[[], AgentRegistry]) -> SessionSlot:
+        now = time.monotonic()
+        with self._lock:
+            s = self._slots.get(sid)
+            if s is None:
+                s = self._slots[sid] = SessionSlot(sid, self.directory, factory)
+            s.lastSeen = now
+        return s
+
+    def start(self) -> None:
+        # Background sweeper running every `sweep_interval` seconds, so spilling never runs
+        # on (or fails) a viewer's script thread.
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        def loop() -> None:
+            while not self._stop.wait(self.sweep_interval):
+                self.sweep()
+        self._thread = threading.Thread(target=loop, name="session-sweep", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def sweep(self, now: Optional[float] = None) -> Tuple[int, int]:
+        # Spills sessions idle longer than idle_ttl and drops those idle past expire_after. A
+        # slot that fails to spill stays resident and is retried with exponential backoff.
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            slots = list(self._slots.values())
+        spilled = expired = 0
+        for s in slots:
+            idle = now - s.lastSeen
+            if now < s.retryAt:
+                continue
+            try:
+                if idle >= self.expire_after:
+                    with self._lock:
+                        self._slots.pop(s.sid, None)
+                    s.discard()
+                    expired += 1
+                elif idle >= self.idle_ttl and s.spill(self.idle_ttl, now):
+                    spilled += 1
+                    s.spillFailures, s.spillError = 0, None
+            except Exception as e:
+                s.spillFailures += 1
+                s.spillError = f"{type(e).__name__}: {e}"
+                s.retryAt = now + min(self.sweep_interval * 2 ** s.spillFailures, SPILL_BACKOFF_MAX)
+                log.warning("session %s: spill failed (%s); retrying in %.0fs",
+                            s.sid[:8], s.spillError, s.retryAt - now)
+        return spilled, expired
+
+    def report(self, now: Optional[float] = None) -> List[dict]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            slots = list(self._slots.values())
+        return [{
+            "session": s.sid[:8],
+            "resident": s.resident,
+            "idleSeconds": round(now - s.lastSeen, 1),
+            "bytes": s.nbytes(),
+            "diskBytes": s.disk_bytes(),
+            "chatMessages": len(s.chat),
+            "spills": s.spills,
+            "spillError": s.spillError,
+        } for s in slots]
+
+    def totals(self, rows: Optional[Iterable[dict]] = None) -> Dict[str, int]:
+        rows = list(self.report() if rows is None else rows)
+        return {
+            "sessions": len(rows),
+            "resident": sum(r["resident"] for r in rows),
+            "bytes": sum(r["bytes"] for r in rows),
+            "diskBytes": sum(r["diskBytes"] for r in rows),
+        }
@@ -0,0 +1,495 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import gc
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate, chain
+from operator import attrgetter
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, get_args
+
+from crowdlike.data import (
+    Agent,
+    AgentPerformance,
+    AgentSettings,
+    AgentStrategy,
+    AgentStatus,
+    Portfolio,
+    Position,
+    SafetyExit,
+    StrategyType,
+    Trade,
+    User,
+    UserSettings,
+)
+
+# Snapshot file layout (all integers little-endian):
+#
+#   header   MAGIC, schema version, flags, reserved          (16 bytes)
+#   blocks   one row group per `block_size` agents; every column of the
+#            group is a contiguous typed array
+#   footer   JSON: schema, user, per-block column directory and dictionaries
+#   trailer  footer offset, footer length, MAGIC              (20 bytes)
+#
+# Column kinds:
+#   "str"    utf-8 blob + uint32 offsets (`<name>.off`, `<name>.data`)
+#   "cat"    int32 codes into a per-block dictionary kept in the footer
+#   "enum"   int8 codes into a fixed tuple (-1 = None)
+#   "time"   int64 microseconds since 1970-01-01 (naive), INT64_MIN = None
+#   "bool"   int8
+#   d / i    float64 / int32
+#
+# Child tables (positions, trades, safety exits) are stored per block with an
+# `<table>.off` column of n+1 row offsets so a single agent can be decoded
+# straight from the memory map without touching the rest of the block.
+
+MAGIC = b"CRWDSNAP"
+SCHEMA_VERSION = 1
+DEFAULT_BLOCK_SIZE = 65_536
+
+_HEADER = struct.Struct("<8sHHI")
+_TRAILER = struct.Struct("<QI8s")
+
+_EPOCH = dt.datetime(1970, 1, 1)
+_ONE_US = dt.timedelta(microseconds=1)
+_NO_TIME = -(2 ** 63)
+
+STRATEGIES: Tuple[str, ...] = get_args(StrategyType)
+STATUSES: Tuple[str, ...] = get_args(AgentStatus)
+COPY_MODES: Tuple[str, ...] = ("mirror", "rules", "strategy")
+SIDES: Tuple[str, ...] = ("buy", "sell")
+EXIT_TYPES: Tuple[str, ...] = ("max_daily_loss", "max_drawdown", "fraud_alert")
+
+STR, CAT, ENUM, TIME, BOOL = "str", "cat", "enum", "time", "bool"
+
+class SnapshotError(ValueError):
+    pass
+
+def _to_us(t: Optional[dt.datetime]) -> int:
+    return _NO_TIME if t is None else (t - _EPOCH) // _ONE_US
+
+def _from_us(v: int) -> Optional[dt.datetime]:
+    return None if v == _NO_TIME else _EPOCH + dt.timedelta(microseconds=v)
+
+# (column name, kind, attribute path, enum values). Grouped columns are listed in the
+# positional order of the dataclass they are rebuilt into on restore.
+Column = Tuple[str, str, str, Tuple[str, ...]]
+
+STRATEGY_COLUMNS: List[Column] = [
+    ("strategy.type", ENUM, "strategy.type", STRATEGIES),
+    ("strategy.copyMode", ENUM, "strategy.copyMode", COPY_MODES),
+]
+PORTFOLIO_COLUMNS: List[Column] = [
+    ("portfolio.agentId", STR, "portfolio.agentId", ()),
+    ("portfolio.usdcBalance", "d", "portfolio.usdcBalance", ()),
+    ("portfolio.totalValue", "d", "portfolio.totalValue", ()),
+    ("portfolio.lastUpdated", TIME, "portfolio.lastUpdated", ()),
+]
+SETTINGS_COLUMNS: List[Column] = [
+    ("settings.maxPositionSize", "d", "settings.maxPositionSize", ()),
+    ("settings.maxTradesPerDay", "i", "settings.maxTradesPerDay", ()),
+    ("settings.autoApprove", BOOL, "settings.autoApprove", ()),
+]
+PERFORMANCE_COLUMNS: List[Column] = [
+    ("performance.totalProfit", "d", "performance.totalProfit", ()),
+    ("performance.totalProfitPercent", "d", "performance.totalProfitPercent", ()),
+    ("performance.streaks", "i", "performance.streaks", ()),
+    ("performance.winRate", "d", "performance.winRate", ()),
+    ("performance.totalTrades", "i", "performance.totalTrades", ()),
+    ("performance.profitableTrades", "i", "performance.profitableTrades", ()),
+    ("performance.avgTradeSize", "d", "performance.avgTradeSize", ()),
+    ("performance.maxDrawdown", "d", "performance.maxDrawdown", ()),
+    ("performance.crowdDeviation", "d", "performance.crowdDeviation", ()),
+]
+AGENT_COLUMNS: List[Column] = [
+    ("id", STR, "id", ()),
+    ("botId", STR, "botId", ()),
+    ("name", STR, "name", ()),
+    ("userId", CAT, "userId", ()),
+    ("riskness", "i", "riskness", ()),
+    ("status", ENUM, "status", STATUSES),
+    ("createdAt", TIME, "createdAt", ()),
+    ("lastTradeAt", TIME, "lastTradeAt", ()),
+    *STRATEGY_COLUMNS,
+    *PORTFOLIO_COLUMNS,
+    *SETTINGS_COLUMNS,
+    *PERFORMANCE_COLUMNS,
+]
+
+# child table name -> (attribute path of the list on Agent, columns in dataclass order)
+CHILD_TABLES: Dict[str, Tuple[str, List[Column]]] = {
+    "positions": ("portfolio.positions", [
+        ("symbol", CAT, "symbol", ()),
+        ("amount", "d", "amount", ()),
+        ("entryPrice", "d", "entryPrice", ()),
+        ("currentPrice", "d", "currentPrice", ()),
+    ]),
+    "trades": ("portfolio.trades", [
+        ("id", STR, "id", ()),
+        ("agentId", CAT, "agentId", ()),
+        ("symbol", CAT, "symbol", ()),
+        ("side", ENUM, "side", SIDES),
+        ("amount", "d", "amount", ()),
+        ("price", "d", "price", ()),
+        ("timestamp", TIME, "timestamp", ()),
+    ]),
+    "safetyExits": ("settings.safetyExits", [
+        ("id", CAT, "id", ()),
+        ("type", ENUM, "type", EXIT_TYPES),
+        ("threshold", "d", "threshold", ()),
+        ("enabled", BOOL, "enabled", ()),
+        ("triggeredAt", TIME, "triggeredAt", ()),
+    ]),
+}
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Bulk object construction only creates acyclic garbage; the cyclic collector
+    # would otherwise rescan the growing fleet every few thousand allocations.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _user_to_dict(user: User) -> dict:
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "usdcBalance": user.usdcBalance,
+        "createdAt": user.createdAt.isoformat(),
+        "settings": vars(user.settings).copy(),
+    }
+
+def _user_from_dict(d: dict) -> User:
+    return User(
+        id=d["id"],
+        name=d["name"],
+        email=d["email"],
+        usdcBalance=d["usdcBalance"],
+        createdAt=dt.datetime.fromisoformat(d["createdAt"]),
+        settings=UserSettings(**d["settings"]),
+    )
+
+# --------- Writer ----------
+def _replaceable(path: str) -> bool:
+    # Only a missing path or a regular file may be replaced by rename.
+    try:
+        return stat.S_ISREG(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return True
+
+class SnapshotWriter:
+    def __init__(self, path_or_file: Any, user: Optional[User] = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        # A regular-file path is written to a temporary file beside it and renamed over it on
+        # close, so readers of the path see either the previous snapshot or the complete new
+        # one. Anything else (a device, pipe or symlink) is opened and written in place.
+        self._own = isinstance(path_or_file, (str, bytes)) or hasattr(path_or_file, "__fspath__")
+        self._path = os.fsdecode(path_or_file) if self._own else None
+        self._tmp = (f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                     if self._own and _replaceable(self._path) else None)  # type: ignore[arg-type]
+        self._f: BinaryIO = open(self._tmp or self._path, "wb") if self._own else path_or_file  # type: ignore[arg-type]
+        self._user = user
+        self._block_size = max(1, block_size)
+        self._blocks: List[dict] = []
+        self._pending: List[Agent] = []
+        self._count = 0
+        self._closed = False
+        self._f.write(_HEADER.pack(MAGIC, SCHEMA_VERSION, 0, 0))
+
+    @property
+    def count(self) -> int:
+        return self._count + len(self._pending)
+
+    def write(self, agent: Agent) -> None:
+        self._pending.append(agent)
+        if len(self._pending) >= self._block_size:
+            self.flush()
+
+    def write_many(self, agents: Iterable[Agent]) -> None:
+        for a in agents:
+            self.write(a)
+
+    def _raw(self, block: dict, name: str, typecode: str, values: Iterable[Any]) -> None:
+        buf = array(typecode, values)
+        if sys.byteorder != "little":
+            buf.byteswap()
+        block["columns"][name] = [self._f.tell(), len(buf) * buf.itemsize, typecode]
+        buf.tofile(self._f)
+
+    def _put(self, block: dict, col: Column, rows: list) -> None:
+        name, kind, path, values = col
+        raw = list(map(attrgetter(path), rows))
+        if kind == STR:
+            encoded = [v.encode("utf-8") for v in raw]
+            self._raw(block, f"{name}.off", "I", accumulate(map(len, encoded), initial=0))
+            data = b"".join(encoded)
+            block["columns"][f"{name}.data"] = [self._f.tell(), len(data), "B"]
+            self._f.write(data)
+        elif kind == CAT:
+            uniq = list(dict.fromkeys(raw))
+            block["dicts"][name] = uniq
+            self._raw(block, name, "i", map({v: i for i, v in enumerate(uniq)}.__getitem__, raw))
+        elif kind == ENUM:
+            codes = {v: i for i, v in enumerate(values)}
+            codes[None] = -1
+            self._raw(block, name, "b", map(codes.__getitem__, raw))
+        elif kind == TIME:
+            # fleets share a handful of timestamps (e.g. lastUpdated); convert each once
+            conv = {t: _to_us(t) for t in set(raw)}
+            self._raw(block, name, "q", map(conv.__getitem__, raw))
+        elif kind == BOOL:
+            self._raw(block, name, "b", map(bool, raw))
+        else:
+            self._raw(block, name, kind, raw)
+
+    def flush(self) -> None:
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        block: dict = {"count": len(rows), "columns": {}, "dicts": {}}
+        with _gc_paused():
+            for col in AGENT_COLUMNS:
+                self._put(block, col, rows)
+            for table, (path, cols) in CHILD_TABLES.items():
+                lists = list(map(attrgetter(path), rows))
+                self._raw(block, f"{table}.off", "I", accumulate(map(len, lists), initial=0))
+                flat = list(chain.from_iterable(lists))
+                for name, kind, attr, values in cols:
+                    self._put(block, (f"{table}.{name}", kind, attr, values), flat)
+        self._blocks.append(block)
+        self._count += len(rows)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        footer = json.dumps({
+            "schema": SCHEMA_VERSION,
+            "count": self._count,
+            "createdAt": dt.datetime.now().isoformat(timespec="seconds"),
+            "user": _user_to_dict(self._user) if self._user else None,
+            "blocks": self._blocks,
+        }, separators=(",", ":")).encode("utf-8")
+        offset = self._f.tell()
+        self._f.write(footer)
+        self._f.write(_TRAILER.pack(offset, len(footer), MAGIC))
+        self._f.flush()
+        if self._tmp:
+            os.fsync(self._f.fileno())
+            self._f.close()
+            os.replace(self._tmp, self._path)  # type: ignore[arg-type]
+        elif self._own:
+            self._f.close()
+        self._closed = True
+
+    def abort(self) -> None:
+        # Drop a partially written snapshot; the target path is left untouched.
+        if self._closed:
+            return
+        self._closed = True
+        if self._own:
+            self._f.close()
+        if self._tmp:
+            try:
+                os.unlink(self._tmp)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+# --------- Reader ----------
+class SnapshotReader:
+    def __init__(self, path: Any):
+        self._f = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise SnapshotError("empty snapshot file")
+        self._buf = memoryview(self._mm)
+        self._views: Dict[Tuple[int, str], memoryview] = {}
+        self._index: Optional[Dict[str, int]] = None
+        try:
+            self._load_footer()
+        except Exception:
+            self.close()
+            raise
+
+    def _load_footer(self) -> None:
+        if len(self._mm) < _HEADER.size + _TRAILER.size:
+            raise SnapshotError("truncated snapshot")
+        magic, version, _, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError("not a crowdlike snapshot")
+        if version > SCHEMA_VERSION:
+            raise SnapshotError(f"snapshot schema v{version} is newer than supported v{SCHEMA_VERSION}")
+        offset, length, magic = _TRAILER.unpack_from(self._mm, len(self._mm) - _TRAILER.size)
+        if magic != MAGIC:
+            raise SnapshotError("snapshot trailer missing (incomplete write?)")
+        footer = json.loads(bytes(self._buf[offset:offset + length]))
+        self.schema: int = footer["schema"]
+        self.createdAt: str = footer.get("createdAt", "")
+        self.user: Optional[User] = _user_from_dict(footer["user"]) if footer.get("user") else None
+        self._blocks: List[dict] = footer["blocks"]
+        self._starts = [0, *accumulate(b["count"] for b in self._blocks)]
+
+    def __len__(self) -> int:
+        return self._starts[-1]
+
+    def _col(self, b: int, name: str) -> memoryview:
+        key = (b, name)
+        view = self._views.get(key)
+        if view is None:
+            offset, nbytes, typecode = self._blocks[b]["columns"][name]
+            view = self._buf[offset:offset + nbytes]
+            if typecode != "B":
+                if sys.byteorder != "little":
+                    arr = array(typecode, view)
+                    arr.byteswap()
+                    view = memoryview(arr)
+                else:
+                    view = view.cast(typecode)
+            self._views[key] = view
+        return view
+
+    def _strings(self, b: int, name: str, lo: int, hi: int) -> List[str]:
+        off = self._col(b, f"{name}.off")
+        start, stop = off[lo], off[hi]
+        raw = bytes(self._col(b, f"{name}.data")[start:stop])
+        text = raw.decode("utf-8")
+        offs = [o - start for o in off[lo:hi + 1].tolist()]
+        src: Any = text if len(text) == len(raw) else raw  # ascii: byte offsets == char offsets
+        out = list(map(src.__getitem__, map(slice, offs, offs[1:])))
+        return out if src is text else [s.decode("utf-8") for s in out]
+
+    def _decode(self, b: int, col: Column, lo: int, hi: int) -> list:
+        name, kind, _, values = col
+        if kind == STR:
+            return self._strings(b, name, lo, hi)
+        codes = self._col(b, name)[lo:hi].tolist()
+        if kind == CAT:
+            return list(map(self._blocks[b]["dicts"][name].__getitem__, codes))
+        if kind == ENUM:
+            return list(map((values + (None,)).__getitem__, codes))
+        if kind == TIME:
+            conv = {v: _from_us(v) for v in set(codes)}
+            return list(map(conv.__getitem__, codes))
+        if kind == BOOL:
+            return list(map(bool, codes))
+        return codes
+
+    def _locate(self, i: int) -> Tuple[int, int]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("agent index out of range")
+        b = bisect.bisect_right(self._starts, i) - 1
+        return b, i - self._starts[b]
+
+    def _children(self, b: int, table: str, cls: type, lo: int, hi: int) -> List[list]:
+        # Rows of a child table for agents [lo, hi), grouped per agent.
+        _, cols = CHILD_TABLES[table]
+        off = self._col(b, f"{table}.off")[lo:hi + 1].tolist()
+        first, last = off[0], off[-1]
+        items = list(map(cls, *(self._decode(b, (f"{table}.{n}", k, a, v), first, last) for n, k, a, v in cols)))
+        rel = [o - first for o in off]
+        return list(map(items.__getitem__, map(slice, rel, rel[1:])))
+
+    def _build(self, b: int, lo: int, hi: int) -> List[Agent]:
+        # Decode rows [lo, hi) of block b column-at-a-time, then assemble objects with map().
+        with _gc_paused():
+            c = {col[0]: self._decode(b, col, lo, hi) for col in AGENT_COLUMNS}
+            group = lambda cols: [c[col[0]] for col in cols]
+            positions = self._children(b, "positions", Position, lo, hi)
+            trades = self._children(b, "trades", Trade, lo, hi)
+            exits = self._children(b, "safetyExits", SafetyExit, lo, hi)
+            p_agent, p_usdc, p_total, p_updated = group(PORTFOLIO_COLUMNS)
+            s_max, s_trades, s_auto = group(SETTINGS_COLUMNS)
+            return list(map(
+                Agent,
+                c["id"], c["botId"], c["name"], c["userId"],
+                map(AgentStrategy, *group(STRATEGY_COLUMNS)),
+                c["riskness"], c["status"],
+                map(Portfolio, p_agent, p_usdc, p_total, positions, trades, p_updated),
+                map(AgentSettings, s_max, s_trades, s_auto, exits),
+                map(AgentPerformance, *group(PERFORMANCE_COLUMNS)),
+                c["createdAt"], c["lastTradeAt"],
+            ))
+
+    def __getitem__(self, i: int) -> Agent:
+        b, k = self._locate(i)
+        return self._build(b, k, k + 1)[0]
+
+    def __iter__(self) -> Iterator[Agent]:
+        for b, block in enumerate(self._blocks):
+            yield from self._build(b, 0, block["count"])
+
+    def agents(self) -> List[Agent]:
+        out: List[Agent] = []
+        for b, block in enumerate(self._blocks):
+            out.extend(self._build(b, 0, block["count"]))
+        return out
+
+    def ids(self) -> List[str]:
+        out: List[str] = []
+        for b, block in enumerate(self._blocks):
+            out.extend(self._strings(b, "id", 0, block["count"]))
+        return out
+
+    def get(self, agent_id: str) -> Optional[Agent]:
+        if self._index is None:
+            self._index = {aid: i for i, aid in enumerate(self.ids())}
+        i = self._index.get(agent_id)
+        return None if i is None else self[i]
+
+    def column(self, name: str) -> list:
+        # Agent-level column across all blocks without building Agent objects.
+        col = next((c for c in AGENT_COLUMNS if c[0] == name), None)
+        if col is None:
+            raise KeyError(name)
+        out: list = []
+        for b, block in enumerate(self._blocks):
+            out.extend(self._decode(b, col, 0, block["count"]))
+        return out
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._buf.release()
+        self._mm.close()
+        self._f.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def save_fleet(path: Any, agents: Iterable[Agent], user: Optional[User] = None, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    with SnapshotWriter(path, user=user, block_size=block_size) as w:
+        w.write_many(agents)
+        return w.count
+
+def load_fleet(path: Any) -> Tuple[Optional[User], List[Agent]]:
+    with SnapshotReader(path) as r:
+        return r.user, r.agents()
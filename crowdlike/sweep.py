@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from crowdlike.market import DEMO_ASSETS
+from crowdlike.risk import MARKET_SEED, TRADING_DAYS
+
+# Parameter sweep over daily close prices:
+#   python -m crowdlike.sweep --random 5000 --workers 8 --cache sweep_cache.json
+#   python -m crowdlike.sweep --grid --top 20
+
+STRATEGIES: List[str] = ["aggressive","conservative","balanced","swing","daytrading","hodl"]
+FEE_BPS = 10.0
+BACKTEST_VERSION = 2  # part of the cache key; bump when backtest() results change
+
+@dataclass(frozen=True)
+class SweepParams:
+    strategy: str
+    riskness: int
+    maxPositionSize: float  # % of equity per symbol
+    dailyLossExit: float  # max_daily_loss threshold %; 0 disables the exit
+    drawdownExit: float  # max_drawdown threshold %; 0 disables the exit
+
+    def key(self) -> str:
+        return f"{self.strategy}|{self.riskness}|{self.maxPositionSize:g}|{self.dailyLossExit:g}|{self.drawdownExit:g}"
+
+@dataclass
+class SweepResult:
+    params: SweepParams
+    totalReturn: float  # %
+    maxDrawdown: float  # %
+    sharpe: float
+    volatility: float  # annualised %
+    trades: int
+    exitDay: Optional[int] = None  # day a safety exit flattened the book
+
+    def row(self) -> dict:
+        out = asdict(self.params)
+        out.update({f.name: getattr(self, f.name) for f in fields(self) if f.name != "params"})
+        return out
+
+    @classmethod
+    def from_row(cls, row: dict) -> "SweepResult":
+        names = {f.name for f in fields(SweepParams)}
+        params = SweepParams(**{k: v for k, v in row.items() if k in names})
+        return cls(params, **{k: v for k, v in row.items() if k not in names})
+
+# --------- price history ----------
+class PriceHistory:
+    # Daily closes, one row per symbol. `digest` identifies the data (and the backtest
+    # version) in cache keys.
+    def __init__(self, symbols: Sequence[str], closes: np.ndarray):
+        self.symbols = list(symbols)
+        self.closes = np.ascontiguousarray(closes, dtype=float)
+        h = hashlib.blake2b(digest_size=12)
+        h.update(f"v{BACKTEST_VERSION}|".encode("utf-8"))
+        h.update(",".join(self.symbols).encode("utf-8"))
+        h.update(self.closes.tobytes())
+        self.digest = h.hexdigest()
+
+    @property
+    def days(self) -> int:
+        return self.closes.shape[1]
+
+    @classmethod
+    def demo(cls, days: int = TRADING_DAYS, seed: int = MARKET_SEED) -> "PriceHistory":
+        # Deterministic correlated random walk from the demo reference prices.
+        rng = np.random.default_rng(seed)
+        market = rng.normal(0.0005, 0.025, days)
+        base = np.array([p for _, _, p in DEMO_ASSETS])
+        r = 1.1 * market[None, :] + rng.normal(0.0, 0.02, (len(base), days))
+        return cls([s for s, _, _ in DEMO_ASSETS], base[:, None] * np.exp(np.cumsum(r, axis=1)))
+
+    @classmethod
+    def from_csv(cls, path: str) -> "PriceHistory":
+        # Long format with columns date,symbol,close; missing days are forward-filled.
+        df = pd.read_csv(path)
+        wide = df.pivot_table(index="date", columns="symbol", values="close", aggfunc="last").sort_index().ffill().bfill()
+        return cls([str(s).upper() for s in wide.columns], wide.to_numpy().T)
+
+# --------- backtest ----------
+def _ma(x: np.ndarray, n: int) -> np.ndarray:
+    c = np.cumsum(np.pad(x, ((0, 0), (n, 0)), mode="edge"), axis=1)
+    return (c[:, n:] - c[:, :-n]) / n
+
+def strategy_signals(strategy: str, closes: np.ndarray) -> np.ndarray:
+    # Target long exposure per symbol per day in [0, 1], decided on that day's close.
+    if strategy == "hodl":
+        return np.ones_like(closes)
+    if strategy == "aggressive":
+        return (closes > _ma(closes, 5)).astype(float)
+    if strategy == "swing":
+        return (_ma(closes, 5) > _ma(closes, 20)).astype(float)
+    if strategy == "daytrading":
+        prev = np.concatenate([closes[:, :1], closes[:, :-1]], axis=1)
+        return (closes < prev).astype(float)  # buy yesterday's losers
+    if strategy == "conservative":
+        return 0.5 * (closes > _ma(closes, 50))
+    # balanced / custom: half buy-and-hold, half trend
+    return 0.5 + 0.5 * (_ma(closes, 5) > _ma(closes, 20))
+
+def backtest(params: SweepParams, closes: np.ndarray, signals: Optional[np.ndarray] = None,
+             fee_bps: float = FEE_BPS) -> SweepResult:
+    if signals is None:
+        signals = strategy_signals(params.strategy, closes)
+    leverage = 0.5 + params.riskness / 100
+    w = np.minimum(signals * (params.maxPositionSize / 100) * leverage, 1.0)
+    gross = w.sum(axis=0)
+    w = w / np.maximum(gross, 1.0)  # never more than fully invested
+    rets = closes[:, 1:] / closes[:, :-1] - 1
+    # the trade into w_t (including the initial entry, t = 0) is paid in day t's return
+    turnover = np.abs(np.diff(w, axis=1, prepend=0.0)).sum(axis=0)
+    daily = (w[:, :-1] * rets).sum(axis=0) - turnover[:-1] * fee_bps / 1e4
+
+    equity = np.cumprod(1 + daily)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    dd = 1 - equity / peak
+    trip = np.zeros(len(daily), dtype=bool)
+    if params.dailyLossExit > 0:
+        trip |= daily <= -params.dailyLossExit / 100
+    if params.drawdownExit > 0:
+        trip |= dd >= params.drawdownExit / 100
+    exit_day = int(np.argmax(trip)) if trip.any() else None
+    if exit_day is not None:
+        daily[exit_day + 1:] = 0.0
+        equity = np.cumprod(1 + daily)
+        dd = 1 - equity / np.maximum.accumulate(np.maximum(equity, 1.0))
+        turnover[exit_day + 1:] = 0.0
+
+    std = float(daily.std())
+    return SweepResult(
+        params=params,
+        totalReturn=float(equity[-1] - 1) * 100 if len(equity) else 0.0,
+        maxDrawdown=float(dd.max()) * 100 if len(dd) else 0.0,
+        sharpe=float(daily.mean() / std * np.sqrt(TRADING_DAYS)) if std > 0 else 0.0,
+        volatility=std * np.sqrt(TRADING_DAYS) * 100,
+        trades=int((turnover > 1e-12).sum()),
+        exitDay=exit_day,
+    )
+
+# Worker state: the price matrix is shipped once per process, signals are computed once per
+# strategy per process.
+_CLOSES: Optional[np.ndarray] = None
+_SIGNALS: Dict[str, np.ndarray] = {}
+
+def _init_worker(closes: np.ndarray) -> None:
+    global _CLOSES
+    _CLOSES = closes
+    _SIGNALS.clear()
+
+def _run_chunk(chunk: List[SweepParams]) -> List[SweepResult]:
+    out = []
+    for p in chunk:
+        sig = _SIGNALS.get(p.strategy)
+        if sig is None:
+            sig = _SIGNALS[p.strategy] = strategy_signals(p.strategy, _CLOSES)
+        out.append(backtest(p, _CLOSES, sig))
+    return out
+
+# --------- search spaces ----------
+def grid(strategies: Sequence[str] = STRATEGIES,
+         riskness: Sequence[int] = (20, 40, 60, 80, 100),
+         position_sizes: Sequence[float] = (5, 10, 20, 35, 50),
+         daily_losses: Sequence[float] = (0, 5, 10),
+         drawdowns: Sequence[float] = (0, 15, 30)) -> List[SweepParams]:
+    return [SweepParams(*combo) for combo in itertools.product(strategies, riskness, position_sizes, daily_losses, drawdowns)]
+
+def random_search(n: int, seed: int = 0, strategies: Sequence[str] = STRATEGIES) -> List[SweepParams]:
+    rng = np.random.default_rng(seed)
+    seen: Dict[str, SweepParams] = {}
+    for _ in range(n * 4):
+        if len(seen) >= n:
+            break
+        p = SweepParams(
+            strategy=str(rng.choice(strategies)),
+            riskness=int(rng.integers(0, 101)),
+            maxPositionSize=float(rng.integers(1, 21) * 2.5),
+            dailyLossExit=float(rng.choice([0, 2.5, 5, 7.5, 10, 15])),
+            drawdownExit=float(rng.choice([0, 10, 15, 20, 30, 40])),
+        )
+        seen.setdefault(p.key(), p)
+    return list(seen.values())
+
+# --------- cache ----------
+class SweepCache:
+    # Backtest results keyed by (price digest, params); optionally persisted as JSON.
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._results: Dict[Tuple[str, str], SweepResult] = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for digest, rows in json.load(f).items():
+                    for row in rows:
+                        r = SweepResult.from_row(row)
+                        self._results[(digest, r.params.key())] = r
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, digest: str, params: SweepParams) -> Optional[SweepResult]:
+        return self._results.get((digest, params.key()))
+
+    def put(self, digest: str, result: SweepResult) -> None:
+        self._results[(digest, result.params.key())] = result
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        by_digest: Dict[str, List[dict]] = {}
+        for (digest, _), r in self._results.items():
+            by_digest.setdefault(digest, []).append(r.row())
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(by_digest, f)
+        os.replace(tmp, self.path)
+
+# --------- ranking ----------
+def pareto_frontier(results: Iterable[SweepResult]) -> List[SweepResult]:
+    # Variants not beaten on both return (higher) and drawdown (lower), best return first.
+    ordered = sorted(results, key=lambda r: (-r.totalReturn, r.maxDrawdown))
+    frontier: List[SweepResult] = []
+    best_dd = float("inf")
+    for r in ordered:
+        if r.maxDrawdown < best_dd:
+            frontier.append(r)
+            best_dd = r.maxDrawdown
+    return frontier
+
+@dataclass
+class SweepReport:
+    results: List[SweepResult]
+    frontier: List[SweepResult]
+    hits: int
+    misses: int
+    seconds: float
+
+    def top(self, k: int = 10, by: str = "sharpe") -> List[SweepResult]:
+        return sorted(self.results, key=lambda r: getattr(r, by), reverse=by != "maxDrawdown")[:k]
+
+    def to_frame(self, frontier_only: bool = False) -> pd.DataFrame:
+        return pd.DataFrame([r.row() for r in (self.frontier if frontier_only else self.results)])
+
+def run_sweep(variants: Sequence[SweepParams], history: PriceHistory, workers: Optional[int] = None,
+              cache: Optional[SweepCache] = None, chunk_size: int = 256) -> SweepReport:
+    start = time.perf_counter()
+    cache = cache if cache is not None else SweepCache()
+    digest = history.digest
+    results: Dict[str, SweepResult] = {}
+    todo: List[SweepParams] = []
+    for p in variants:
+        hit = cache.get(digest, p)
+        if hit is not None:
+            results[p.key()] = hit
+        elif p.key() not in results:
+            todo.append(p)
+            results[p.key()] = None  # type: ignore[assignment]
+    hits = len(variants) - len(todo)
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker(history.closes)
+        computed = map(_run_chunk, chunks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker,
+                                   initargs=(history.closes,))
+        computed = pool.map(_run_chunk, chunks)
+    try:
+        for chunk in computed:
+            for r in chunk:
+                cache.put(digest, r)
+                results[r.params.key()] = r
+    finally:
+        if workers > 1 and len(chunks) > 1:
+            pool.shutdown()
+    cache.hits += hits
+    cache.misses += len(todo)
+
+    ordered = [results[p.key()] for p in variants]
+    return SweepReport(ordered, pareto_frontier(ordered), hits, len(todo), time.perf_counter() - start)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m crowdlike.sweep", description="Crowdlike strategy parameter sweep")
+    p.add_argument("--prices", help="CSV of daily closes (date,symbol,close); default: demo history")
+    p.add_argument("--grid", action="store_true", help="evaluate the full default grid")
+    p.add_argument("--random", type=int, default=1000, help="random-search variants (ignored with --grid)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--cache", help="JSON file of memoized results, read and updated")
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--out", help="write all results as CSV")
+    args = p.parse_args(argv)
+
+    history = PriceHistory.from_csv(args.prices) if args.prices else PriceHistory.demo()
+    variants = grid() if args.grid else random_search(args.random, seed=args.seed)
+    cache = SweepCache(args.cache)
+    report = run_sweep(variants, history, workers=args.workers, cache=cache)
+    cache.save()
+
+    print(f"{len(variants)} variants over {len(history.symbols)} symbols x {history.days} days "
+          f"in {report.seconds:.2f}s ({report.hits} cached, {report.misses} computed)")
+    frame = report.to_frame(frontier_only=True)
+    if not frame.empty:
+        print(frame.head(args.top).round(2).to_string(index=False))
+    if args.out:
+        report.to_frame().to_csv(args.out, index=False)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+from crowdlike.data import DEFAULT_ASSETS, Agent
+from crowdlike.market import DEMO_ASSETS
+
+# Tick path: producers -> TickQueue (fixed NumPy ring, backpressure policy) -> drain() groups the
+# batch by symbol -> per-symbol RingBuffer -> subscribers read latest()/window() views.
+# Nothing on the per-tick path allocates; allocation happens once per drained batch.
+
+Policy = Literal["block","drop_newest","drop_oldest"]
+
+SYMBOLS: List[str] = [sym for sym, _ in DEFAULT_ASSETS]
+
+class RingBuffer:
+    # Fixed-size series stored twice back to back, so the last n points are always one
+    # contiguous slice and window() can hand out views instead of copies.
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(2 * capacity)
+        self.price = np.zeros(2 * capacity)
+        self.volume = np.zeros(2 * capacity)
+        self._pos = 0
+        self.count = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, ts: float, price: float, volume: float = 0.0) -> None:
+        i, j = self._pos, self._pos + self.capacity
+        self.ts[i] = self.ts[j] = ts
+        self.price[i] = self.price[j] = price
+        self.volume[i] = self.volume[j] = volume
+        self._pos = (self._pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, ts: np.ndarray, price: np.ndarray, volume: np.ndarray) -> None:
+        n = len(ts)
+        if n == 0:
+            return
+        if n > self.capacity:
+            ts, price, volume = ts[-self.capacity:], price[-self.capacity:], volume[-self.capacity:]
+            self.total += n - self.capacity
+            n = self.capacity
+        cap, pos = self.capacity, self._pos
+        first = min(n, cap - pos)
+        for dst, src in ((self.ts, ts), (self.price, price), (self.volume, volume)):
+            dst[pos:pos + first] = src[:first]
+            dst[pos + cap:pos + cap + first] = src[:first]
+            if first < n:
+                dst[:n - first] = src[first:]
+                dst[cap:cap + n - first] = src[first:]
+        self._pos = (pos + n) % cap
+        self.count = min(self.count + n, cap)
+        self.total += n
+
+    def latest(self) -> Tuple[float, float]:
+        if not self.count:
+            return 0.0, 0.0
+        k = self._pos + self.capacity - 1
+        return float(self.ts[k]), float(self.price[k])
+
+    def window(self, n: Optional[int] = None, field: str = "price") -> np.ndarray:
+        # Read-only view of the last n points, oldest first.
+        n = self.count if n is None else min(n, self.count)
+        end = self._pos + self.capacity
+        view = getattr(self, field)[end - n:end]
+        view.flags.writeable = False
+        return view
+
+@dataclass
+class QueueStats:
+    published: int = 0
+    accepted: int = 0
+    droppedNewest: int = 0
+    droppedOldest: int = 0
+    blocked: int = 0
+    blockedSeconds: float = 0.0
+    drained: int = 0
+    batches: int = 0
+    highWater: int = 0
+
+class TickQueue:
+    # Bounded MPSC queue over preallocated NumPy columns.
+    def __init__(self, capacity: int = 65_536, policy: Policy = "drop_oldest", block_timeout: float = 1.0):
+        self.capacity = capacity
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.sym = np.zeros(capacity, dtype=np.int16)
+        self.ts = np.zeros(capacity)
+        self.price = np.zeros(capacity)
+        self.volume = np.zeros(capacity)
+        self._head = 0  # next slot to read
+        self._size = 0
+        self._cond = threading.Condition()
+        self.stats = QueueStats()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _make_room(self, n: int) -> int:
+        # Returns how many of n incoming ticks may be written; caller holds the lock.
+        s = self.stats
+        free = self.capacity - self._size
+        if n <= free:
+            return n
+        if self.policy == "drop_oldest":
+            evict = min(n - free, self._size)
+            self._head = (self._head + evict) % self.capacity
+            self._size -= evict
+            s.droppedOldest += evict
+            return min(n, self.capacity)
+        if self.policy == "block":
+            s.blocked += 1
+            start = time.perf_counter()
+            deadline = time.monotonic() + self.block_timeout
+            while self.capacity - self._size < n and self._size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    break
+            s.blockedSeconds += time.perf_counter() - start
+            free = self.capacity - self._size
+        return min(n, free)  # drop_newest, or block that timed out
+
+    def put(self, sym: int, ts: float, price: float, volume: float = 0.0) -> bool:
+        with self._cond:
+            self.stats.published += 1
+            if not self._make_room(1):
+                self.stats.droppedNewest += 1
+                return False
+            i = (self._head + self._size) % self.capacity
+            self.sym[i] = sym
+            self.ts[i] = ts
+            self.price[i] = price
+            self.volume[i] = volume
+            self._size += 1
+            self.stats.accepted += 1
+            self.stats.highWater = max(self.stats.highWater, self._size)
+            return True
+
+    def put_many(self, sym: np.ndarray, ts: np.ndarray, price: np.ndarray, volume: Optional[np.ndarray] = None) -> int:
+        n = len(sym)
+        with self._cond:
+            self.stats.published += n
+            if self.policy == "drop_oldest" and n > self.capacity:
+                # only the newest `capacity` ticks can survive anyway
+                self.stats.droppedOldest += n - self.capacity
+                sym, ts, price = sym[-self.capacity:], ts[-self.capacity:], price[-self.capacity:]
+                volume = None if volume is None else volume[-self.capacity:]
+                n = self.capacity
+            k = self._make_room(n)
+            self.stats.droppedNewest += n - k
+            tail = (self._head + self._size) % self.capacity
+            first = min(k, self.capacity - tail)
+            for dst, src in ((self.sym, sym), (self.ts, ts), (self.price, price)):
+                dst[tail:tail + first] = src[:first]
+                dst[:k - first] = src[first:k]
+            if volume is None:
+                self.volume[tail:tail + first] = 0.0
+                self.volume[:k - first] = 0.0
+            else:
+                self.volume[tail:tail + first] = volume[:first]
+                self.volume[:k - first] = volume[first:k]
+            self._size += k
+            self.stats.accepted += k
+            self.stats.highWater = max(self.stats.highWater, self._size)
+            return k
+
+    def take(self, max_items: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Copies out up to max_items queued ticks (one allocation per batch) and frees the slots.
+        with self._cond:
+            n = self._size if max_items is None else min(max_items, self._size)
+            idx = (self._head + np.arange(n)) % self.capacity
+            out = (self.sym[idx], self.ts[idx], self.price[idx], self.volume[idx])
+            self._head = (self._head + n) % self.capacity
+            self._size -= n
+            self.stats.drained += n
+            self.stats.batches += 1 if n else 0
+            self._cond.notify_all()
+            return out
+
+Subscriber = Callable[[str, int, RingBuffer], None]
+
+class TickPipeline:
+    def __init__(self, symbols: Sequence[str] = SYMBOLS, capacity: int = 4096, queue_capacity: int = 65_536,
+                 policy: Policy = "drop_oldest"):
+        self.symbols = list(symbols)
+        self.codes: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+        self.buffers: Dict[str, RingBuffer] = {s: RingBuffer(capacity) for s in self.symbols}
+        self.queue = TickQueue(queue_capacity, policy)
+        self._subs: List[Tuple[Subscriber, Optional[frozenset]]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.unknown = 0
+
+    # --------- producers ----------
+    def publish(self, symbol: str, ts: float, price: float, volume: float = 0.0) -> bool:
+        code = self.codes.get(symbol)
+        if code is None:
+            self.unknown += 1
+            return False
+        return self.queue.put(code, ts, price, volume)
+
+    def publish_batch(self, codes: np.ndarray, ts: np.ndarray, price: np.ndarray, volume: Optional[np.ndarray] = None) -> int:
+        return self.queue.put_many(codes, ts, price, volume)
+
+    # --------- consumers ----------
+    def subscribe(self, fn: Subscriber, symbols: Optional[Iterable[str]] = None) -> None:
+        self._subs.append((fn, frozenset(symbols) if symbols is not None else None))
+
+    def drain(self, max_items: Optional[int] = None) -> int:
+        sym, ts, price, vol = self.queue.take(max_items)
+        n = len(sym)
+        if not n:
+            return 0
+        # stable sort keeps per-symbol time order; one slice per symbol into its ring buffer
+        order = np.argsort(sym, kind="stable")
+        sym, ts, price, vol = sym[order], ts[order], price[order], vol[order]
+        bounds = np.searchsorted(sym, np.arange(len(self.symbols) + 1))
+        for code, name in enumerate(self.symbols):
+            lo, hi = bounds[code], bounds[code + 1]
+            if lo == hi:
+                continue
+            buf = self.buffers[name]
+            buf.extend(ts[lo:hi], price[lo:hi], vol[lo:hi])
+            for fn, only in self._subs:
+                if only is None or name in only:
+                    fn(name, int(hi - lo), buf)
+        return n
+
+    def start(self, interval: float = 0.01) -> None:
+        # Background consumer draining every `interval` seconds.
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        def loop() -> None:
+            while not self._stop.is_set():
+                if not self.drain():
+                    self._stop.wait(interval)
+        self._thread = threading.Thread(target=loop, name="tick-drain", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.drain()
+
+    def latest_prices(self) -> Dict[str, float]:
+        return {s: b.latest()[1] for s, b in self.buffers.items() if b.count}
+
+    def window(self, symbol: str, n: Optional[int] = None, field: str = "price") -> np.ndarray:
+        return self.buffers[symbol].window(n, field)
+
+    def stats(self) -> dict:
+        out = asdict(self.queue.stats)
+        out.update(queued=len(self.queue), unknownSymbol=self.unknown,
+                   stored={s: b.total for s, b in self.buffers.items()})
+        return out
+
+# --------- feeds ----------
+Batch = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+class SimulatedFeed:
+    # Geometric random walk per symbol, generated a batch at a time.
+    def __init__(self, symbols: Sequence[str] = SYMBOLS, prices: Optional[Dict[str, float]] = None,
+                 vol_per_tick: float = 0.0005, seed: int = 7, start: Optional[float] = None, tick_interval: float = 0.001):
+        base = prices or {sym: ref for sym, _, ref in DEMO_ASSETS}
+        self.symbols = list(symbols)
+        self._price = np.array([base.get(s, 1.0) for s in self.symbols], dtype=float)
+        self._rng = np.random.default_rng(seed)
+        self.vol = vol_per_tick
+        self._t = time.time() if start is None else start
+        self.dt = tick_interval
+
+    def next_batch(self, n: int) -> Batch:
+        k = len(self.symbols)
+        codes = self._rng.integers(0, k, n).astype(np.int16)
+        shocks = np.zeros((n, k))
+        shocks[np.arange(n), codes] = self._rng.normal(0.0, self.vol, n)
+        path = self._price * np.exp(np.cumsum(shocks, axis=0))
+        price = path[np.arange(n), codes]
+        self._price = path[-1] if n else self._price
+        ts = self._t + self.dt * np.arange(1, n + 1)
+        self._t = float(ts[-1]) if n else self._t
+        volume = self._rng.exponential(1.0, n)
+        return codes, ts, price, volume
+
+    def batches(self, batch_size: int = 1024) -> Iterator[Batch]:
+        while True:
+            yield self.next_batch(batch_size)
+
+class ReplayFeed:
+    # Replays a CSV history file with columns timestamp,symbol,price[,volume]; timestamps are
+    # epoch seconds or ISO 8601.
+    def __init__(self, path: str, symbols: Sequence[str] = SYMBOLS):
+        self.path = path
+        self.codes = {s: i for i, s in enumerate(symbols)}
+        self.skipped = 0
+
+    @staticmethod
+    def _ts(raw: str) -> float:
+        try:
+            return float(raw)
+        except ValueError:
+            return dt.datetime.fromisoformat(raw).timestamp()
+
+    def batches(self, batch_size: int = 4096) -> Iterator[Batch]:
+        codes = np.zeros(batch_size, dtype=np.int16)
+        ts = np.zeros(batch_size)
+        price = np.zeros(batch_size)
+        volume = np.zeros(batch_size)
+        n = 0
+        with open(self.path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                code = self.codes.get(str(row.get("symbol", "")).upper())
+                if code is None:
+                    self.skipped += 1
+                    continue
+                codes[n] = code
+                ts[n] = self._ts(row["timestamp"])
+                price[n] = float(row["price"])
+                volume[n] = float(row.get("volume") or 0.0)
+                n += 1
+                if n == batch_size:
+                    yield codes.copy(), ts.copy(), price.copy(), volume.copy()
+                    n = 0
+        if n:
+            yield codes[:n].copy(), ts[:n].copy(), price[:n].copy(), volume[:n].copy()
+
+def pump(pipeline: TickPipeline, batches: Iterable[Batch], max_ticks: Optional[int] = None,
+         rate: Optional[float] = None) -> int:
+    # Feeds batches into the pipeline, optionally paced to `rate` ticks per second.
+    sent = 0
+    start = time.perf_counter()
+    for codes, ts, price, volume in batches:
+        if max_ticks is not None and sent + len(codes) > max_ticks:
+            k = max_ticks - sent
+            codes, ts, price, volume = codes[:k], ts[:k], price[:k], volume[:k]
+        pipeline.publish_batch(codes, ts, price, volume)
+        sent += len(codes)
+        if rate:
+            ahead = sent / rate - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+        if max_ticks is not None and sent >= max_ticks:
+            break
+    return sent
+
+# --------- subscribers ----------
+def revalue(agents: Iterable[Agent], prices: Dict[str, float]) -> List[Agent]:
+    # Marks positions to the latest prices; returns the agents whose value changed.
+    changed: List[Agent] = []
+    for a in agents:
+        pf = a.portfolio
+        moved = False
+        for p in pf.positions:
+            px = prices.get(p.symbol)
+            if px and px != p.currentPrice:
+                p.currentPrice = px
+                moved = True
+        if moved:
+            pf.totalValue = pf.usdcBalance + sum(p.value for p in pf.positions)
+            changed.append(a)
+    return changed
+
+class SafetyMonitor:
+    # Subscriber that marks agents to market and trips max_daily_loss / max_drawdown exits
+    # against the value each agent had when monitoring started (or its running peak).
+    def __init__(self, agents: Sequence[Agent], pipeline: TickPipeline,
+                 on_exit: Optional[Callable[[Agent], None]] = None):
+        self.agents = list(agents)
+        self.pipeline = pipeline
+        self.on_exit = on_exit
+        self._start = {a.id: a.portfolio.totalValue for a in self.agents}
+        self._peak = dict(self._start)
+        self.tripped: List[Tuple[str, str]] = []
+        self._by_symbol: Dict[str, List[Agent]] = {}
+        for a in self.agents:
+            for p in a.portfolio.positions:
+                self._by_symbol.setdefault(p.symbol, []).append(a)
+        pipeline.subscribe(self._on_ticks, symbols=list(self._by_symbol))
+
+    def _on_ticks(self, symbol: str, n: int, buf: RingBuffer) -> None:
+        px = {symbol: buf.latest()[1]}
+        now = dt.datetime.now()
+        for a in revalue(self._by_symbol.get(symbol, []), px):
+            if a.status == "exited":
+                continue
+            value = a.portfolio.totalValue
+            self._peak[a.id] = max(self._peak[a.id], value)
+            start, peak = self._start[a.id], self._peak[a.id]
+            for ex in a.settings.safetyExits:
+                if not ex.enabled or ex.triggeredAt is not None:
+                    continue
+                loss = (start - value) / start * 100 if ex.type == "max_daily_loss" and start else None
+                dd = (peak - value) / peak * 100 if ex.type == "max_drawdown" and peak else None
+                if (loss is not None and loss >= ex.threshold) or (dd is not None and dd >= ex.threshold):
+                    ex.triggeredAt = now
+                    a.status = "exited"
+                    self.tripped.append((a.id, ex.type))
+                    if self.on_exit:
+                        self.on_exit(a)
+                    break
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
 import streamlit as st
 from typing import List, Tuple
 
@@ -15,167 +19,42 @@ PAGES: List[Tuple[str, str, str]] = [
     ("profile", "Profile", "👤"),
 ]
 
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+THEME_CSS = "crowdlike.css"
+FONT_SRC = ", url('fonts/InterVariable.woff2') format('woff2')"  # bundled Inter in THEME_CSS
+
+def _asset_hash(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=6).hexdigest()
+
+@lru_cache(maxsize=None)
+def asset_url(name: str) -> str:
+    # Content-hashed URL under Streamlit static serving: browsers cache the file until it changes.
+    return f"app/static/{name}?v={_asset_hash(STATIC_DIR / name)}"
+
+@lru_cache(maxsize=None)
+def _inline_css() -> str:
+    # Inlined, the relative font URL would resolve against the page, and without static serving
+    # the bundled font cannot be fetched at all; keep only the local() sources.
+    return (STATIC_DIR / THEME_CSS).read_text(encoding="utf-8").replace(FONT_SRC, "")
+
 def inject_global_css() -> None:
-    st.markdown(
-        """
-<style>
-#MainMenu { visibility: hidden; }
-header { visibility: hidden; }
-footer { visibility: hidden; }
-[data-testid="stToolbar"] { visibility: hidden; height: 0px; }
-
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800;900&display=swap');
-
-html, body, [class*="css"]  {
-  font-family: 'Inter', system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif !important;
-}
-
-.stApp {
-  background: linear-gradient(135deg, #eff6ff 0%, #ffffff 45%, #f5f3ff 100%);
-}
-
-.block-container {
-  max-width: 80rem;
-  padding-top: 2.25rem;
-  padding-bottom: 2.25rem;
-  transition: margin-left 250ms ease;
-  margin-left: 0.5rem;
-}
-
-/* Hover-reveal sidebar */
-:root {
-  --c-sidebar-width: 18rem;       /* 288px */
-  --c-sidebar-edge: 16px;
-  --c-sidebar-z: 10010;
-}
-
-.c-hoverzone {
-  position: fixed;
-  left: 0;
-  top: 0;
-  width: var(--c-sidebar-edge);
-  height: 100vh;
-  z-index: calc(var(--c-sidebar-z) - 1);
-  background: transparent;
-}
-
-section[data-testid="stSidebar"] {
-  position: fixed !important;
-  top: 0;
-  left: 0;
-  height: 100vh !important;
-  width: var(--c-sidebar-width) !important;
-  background: rgba(255,255,255,0.95) !important;
-  backdrop-filter: blur(10px) !important;
-  border-right: 1px solid rgba(0,0,0,0.08) !important;
-  box-shadow: 0 10px 30px rgba(0,0,0,0.10) !important;
-  z-index: var(--c-sidebar-z) !important;
-  transform: translateX(calc(-1 * var(--c-sidebar-width) + var(--c-sidebar-edge)));
-  transition: transform 250ms ease;
-}
-
-section[data-testid="stSidebar"]:hover {
-  transform: translateX(0);
-}
-
-/* :has() is supported by modern Chromium, which Streamlit Cloud uses */
-body:has(.c-hoverzone:hover) section[data-testid="stSidebar"] {
-  transform: translateX(0);
-}
-
-body:has(section[data-testid="stSidebar"]:hover) .block-container,
-body:has(.c-hoverzone:hover) .block-container {
-  margin-left: calc(var(--c-sidebar-width) + 1rem);
-}
-
-section[data-testid="stSidebar"] [data-testid="stSidebarNav"] { display: none; }
-
-/* Cards */
-.c-card {
-  background: #ffffff;
-  border-radius: 0.75rem;
-  box-shadow: 0 10px 25px rgba(0,0,0,0.08);
-  border: 1px solid rgba(0,0,0,0.05);
-}
-.c-card:hover { box-shadow: 0 14px 30px rgba(0,0,0,0.10); }
-.c-card-pad { padding: 1.5rem; }
-
-/* Title gradient */
-.c-title-gradient {
-  background: linear-gradient(90deg, #2563eb 0%, #7c3aed 50%, #db2777 100%);
-  -webkit-background-clip: text;
-  background-clip: text;
-  color: transparent;
-}
-
-.c-muted { color: #6b7280; }
-
-/* Buttons */
-.stButton>button {
-  border-radius: 0.75rem;
-  padding: 0.6rem 0.9rem;
-  font-weight: 700;
-  border: 1px solid rgba(0,0,0,0.08);
-  background: rgba(255,255,255,0.9);
-}
-.stButton>button:hover {
-  border-color: rgba(37,99,235,0.35);
-  box-shadow: 0 10px 18px rgba(37,99,235,0.12);
-}
-
-/* Sidebar nav buttons */
-.c-nav button {
-  width: 100% !important;
-  justify-content: flex-start !important;
-  gap: 0.6rem !important;
-  background: transparent !important;
-  border: none !important;
-  box-shadow: none !important;
-  padding: 0.55rem 0.6rem !important;
-  border-radius: 0.75rem !important;
-  font-weight: 700 !important;
-  color: #111827 !important;
-}
-.c-nav button:hover {
-  background: rgba(243,244,246, 0.9) !important;
-}
-.c-nav-active button {
-  background: rgba(59,130,246,0.10) !important;
-  border: 1px solid rgba(59,130,246,0.18) !important;
-}
-
-[data-testid="stMetricValue"] { font-weight: 900; }
-
-
-/* Mobile: no hover, keep sidebar visible */
-@media (max-width: 768px) {
-  .c-hoverzone { display: none; }
-  section[data-testid="stSidebar"] { transform: translateX(0) !important; }
-  .block-container { margin-left: 0.5rem !important; }
-}
-
-section[data-testid="stSidebar"] > div {
-  padding-top: 1.25rem;
-}
-</style>
-<div class="c-hoverzone"></div>
-        """,
-        unsafe_allow_html=True,
-    )
+    # With static serving on, each rerun sends only a <link> to the cached stylesheet; otherwise
+    # the stylesheet is inlined as before.
+    if st.get_option("server.enableStaticServing"):
+        head = f'<link rel="stylesheet" href="{asset_url(THEME_CSS)}">'
+    else:
+        head = f"<style>{_inline_css()}</style>"
+    st.markdown(head + '<div class="c-hoverzone"></div>', unsafe_allow_html=True)
+
+def spacer(size: str = "") -> None:
+    # Vertical gap: "xs" 0.6rem, "s" 0.75rem, "" 1rem, "m" 1.25rem, "l" 1.5rem.
+    st.markdown(f'<div class="c-sp{"-" + size if size else ""}"></div>', unsafe_allow_html=True)
 
 def sidebar_nav(current: str) -> str:
     with st.sidebar:
         st.markdown(
-            """
-            <div style="padding:0.75rem 1rem 1rem 1rem;">
-              <div style="display:flex; align-items:center; justify-content:space-between; gap:0.75rem;">
-                <div style="font-size:1.4rem; font-weight:900;" class="c-title-gradient">Crowdlike</div>
-              </div>
-              <div class="c-muted" style="margin-top:0.25rem; font-size:0.95rem;">
-                Personal finance, agentic trading, and crowd feedback.
-              </div>
-            </div>
-            """,
+            '<div class="c-brand"><div class="c-brand-t c-title-gradient">Crowdlike</div>'
+            '<div class="c-muted c-brand-s">Personal finance, agentic trading, and crowd feedback.</div></div>',
             unsafe_allow_html=True,
         )
 
@@ -194,44 +73,33 @@ def sidebar_nav(current: str) -> str:
 
         st.markdown("</div>", unsafe_allow_html=True)
 
-        st.markdown(
-            """
-            <div style="padding: 0.75rem 1rem; border-top: 1px solid rgba(0,0,0,0.06); margin-top: 0.75rem;">
-              <div class="c-muted" style="font-size:0.85rem;">
-                Tip: hover near the left edge to reveal the sidebar.
-              </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
+        st.markdown('<div class="c-tip c-muted">Tip: hover near the left edge to reveal the sidebar.</div>', unsafe_allow_html=True)
 
     return chosen
 
 def page_title(title: str, subtitle: str | None = None) -> None:
-    st.markdown(
-        f"""
-        <div style="margin-bottom: 1.25rem;">
-          <div style="font-size: 2.25rem; font-weight: 900;">{title}</div>
-          {f'<div class="c-muted" style="margin-top:0.25rem; font-size:1.05rem;">{subtitle}</div>' if subtitle else ''}
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    sub = f'<div class="c-muted c-pt-s">{subtitle}</div>' if subtitle else ""
+    st.markdown(f'<div class="c-pt"><div class="c-pt-t">{title}</div>{sub}</div>', unsafe_allow_html=True)
 
 def hero_title(title: str, subtitle: str) -> None:
     st.markdown(
-        f"""
-        <div style="text-align:center; padding: 3rem 0 1.5rem 0;">
-          <div class="c-title-gradient" style="font-size:3.5rem; font-weight: 900; line-height:1.05; margin-bottom: 0.75rem;">
-            {title}
-          </div>
-          <div class="c-muted" style="font-size:1.25rem; margin-bottom: 2rem;">
-            {subtitle}
-          </div>
-        </div>
-        """,
+        f'<div class="c-hero"><div class="c-title-gradient c-hero-t">{title}</div>'
+        f'<div class="c-muted c-hero-s">{subtitle}</div></div>',
         unsafe_allow_html=True,
     )
 
-def card(html: str) -> None:
-    st.markdown(f'<div class="c-card c-card-pad">{html}</div>', unsafe_allow_html=True)
+def card(html: str, target=None) -> None:
+    (target or st).markdown(f'<div class="c-card c-card-pad">{html}</div>', unsafe_allow_html=True)
+
+@lru_cache(maxsize=1024)
+def sparkline(values: Tuple[float, ...], width: int = 120, height: int = 32) -> str:
+    # Inline SVG polyline; a few hundred bytes, and cached so unchanged series are not redrawn.
+    if len(values) < 2:
+        return f'<svg class="c-spark" width="{width}" height="{height}"></svg>'
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1.0
+    step = width / (len(values) - 1)
+    pts = " ".join(f"{i * step:.0f},{height - 2 - (v - lo) / span * (height - 4):.0f}" for i, v in enumerate(values))
+    tone = "c-spark-up" if values[-1] >= values[0] else "c-spark-down"
+    return (f'<svg class="c-spark {tone}" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<polyline points="{pts}"/></svg>')